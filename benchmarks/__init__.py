@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark suite for the static site generator.
+
+Run it with ``python -m benchmarks.run``.
+"""
+
+from .corpus import generate_corpus
+
+__all__ = ['generate_corpus']
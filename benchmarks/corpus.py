@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Synthetic content corpus for benchmarks.
+"""
+import os
+import json
+import random
+import shutil
+from typing import List
+
+import yaml
+
+
+WORDS = (
+    'lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut labore '
+    'et dolore magna aliqua enim ad minim veniam quis nostrud exercitation ullamco laboris nisi aliquip '
+    'ex ea commodo consequat duis aute irure in reprehenderit voluptate velit esse cillum fugiat nulla '
+    'pariatur excepteur sint occaecat cupidatat non proident sunt culpa qui officia deserunt mollit anim '
+    'id est laborum static site generator markdown template render build cache page'
+).split()
+
+CODE_SAMPLES = (
+    ('python', 'import random\n\nn = random.randint(1, 10)\nprint("You won!" if n > 5 else f"Nope, it was {n}")'),
+    ('javascript', 'const items = document.querySelectorAll(".item");\n'
+                   'items.forEach((item, i) => {\n    item.dataset.index = i;\n});'),
+    ('bash', 'python gen.py --output site --jobs 4\ncd site && python -m http.server 8000'),
+)
+
+# Written next to the corpus to reuse it when the same size and seed are requested again
+MARKER_FILE = '.corpus.json'
+
+
+def _sentence(rng: random.Random, min_words: int = 6, max_words: int = 18) -> str:
+    """Make a random sentence."""
+    words = rng.choices(WORDS, k=rng.randint(min_words, max_words))
+    return ' '.join(words).capitalize() + '.'
+
+
+def _paragraph(rng: random.Random) -> str:
+    """Make a random paragraph, sometimes with inline markup and a link."""
+    sentences = [_sentence(rng) for _ in range(rng.randint(3, 7))]
+    if rng.random() < 0.5:
+        word = rng.choice(WORDS)
+        sentences[0] = sentences[0].replace(word, f'**{word}**', 1)
+    if rng.random() < 0.3:
+        sentences.append(f'See [the docs](https://example.com/{rng.choice(WORDS)}) for details.')
+    return ' '.join(sentences)
+
+
+def _post(rng: random.Random, number: int) -> str:
+    """Make the markdown of a post with headings, paragraphs, lists and code fences."""
+    parts = [f'# Post number {number}: {_sentence(rng, 3, 6)[:-1]}', f'## {_sentence(rng)}']
+    for section in range(rng.randint(2, 5)):
+        parts.append(f'### Section {section + 1}')
+        parts.extend(_paragraph(rng) for _ in range(rng.randint(1, 3)))
+        roll = rng.random()
+        if roll < 0.4:
+            language, code = rng.choice(CODE_SAMPLES)
+            parts.append(f'```{language}\n{code}\n```')
+        elif roll < 0.7:
+            parts.append('\n'.join(f'- {_sentence(rng, 3, 8)}' for _ in range(rng.randint(2, 6))))
+    return '\n\n'.join(parts) + '\n'
+
+
+def generate_corpus(corpus_dir: str, posts: int, seed: int = 42) -> str:
+    """
+    Write a synthetic site with a blog collection of numbered posts.
+
+    The corpus is deterministic for a given size and seed, and an existing
+    corpus generated with the same parameters is reused.
+
+    Args:
+        corpus_dir: Directory of the site (config.yaml, content/)
+        posts: Number of blog posts
+        seed: Random seed
+
+    Returns:
+        Path of the corpus config file
+    """
+    config_path = os.path.join(corpus_dir, 'config.yaml')
+    marker_path = os.path.join(corpus_dir, MARKER_FILE)
+    marker = {'posts': posts, 'seed': seed}
+    try:
+        with open(marker_path, encoding='utf-8') as f:
+            if json.load(f) == marker:
+                return config_path
+    except (FileNotFoundError, ValueError):
+        pass
+
+    if os.path.exists(corpus_dir):
+        shutil.rmtree(corpus_dir)
+    blog_dir = os.path.join(corpus_dir, 'content', 'blog')
+    os.makedirs(blog_dir)
+    rng = random.Random(seed)
+
+    with open(os.path.join(corpus_dir, 'content', 'home.md'), 'w', encoding='utf-8') as f:
+        f.write(f'# Benchmark site\n\n## {posts} synthetic posts\n\n{_paragraph(rng)}\n')
+    with open(os.path.join(corpus_dir, 'content', 'about.md'), 'w', encoding='utf-8') as f:
+        f.write(f'# About\n\n{_paragraph(rng)}\n')
+
+    for number in range(1, posts + 1):
+        slug = '-'.join(rng.choices(WORDS, k=3))
+        with open(os.path.join(blog_dir, f'{number}-{slug}-{number}.md'), 'w', encoding='utf-8') as f:
+            f.write(_post(rng, number))
+
+    config = {
+        'title': f'Benchmark ({posts} posts)',
+        'base_url': '/',
+        'homepage': 'content/home.md',
+        'pages': [
+            {'title': 'About', 'path': 'content/about.md'},
+            {'title': 'Blog', 'path': 'content/blog'},
+        ],
+    }
+    with open(config_path, 'w', encoding='utf-8') as f:
+        yaml.safe_dump(config, f, sort_keys=False)
+    with open(marker_path, 'w', encoding='utf-8') as f:
+        json.dump(marker, f)
+    return config_path
+
+
+def corpus_sizes(names: List[str]) -> List[int]:
+    """Parse corpus sizes such as '1k', '10k' or '2500'."""
+    sizes = []
+    for name in names:
+        name = name.lower()
+        sizes.append(int(float(name[:-1]) * 1000) if name.endswith('k') else int(name))
+    return sizes
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark runner: builds synthetic corpora and compares the results with a baseline.
+
+Usage:
+    python -m benchmarks.run --sizes 1k 10k --jobs 4
+    python -m benchmarks.run --sizes 1k --save-baseline
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import resource
+import argparse
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any
+
+from site_generator import generate_site
+from benchmarks.corpus import generate_corpus, corpus_sizes
+
+
+DEFAULT_SIZES = ['1k', '10k', '100k']
+DEFAULT_BASELINE = os.path.join('benchmarks', 'baseline.json')
+
+# Metrics compared with the baseline; higher is worse for all of them
+COMPARED_METRICS = ('build_seconds', 'peak_rss_mb')
+
+
+def _peak_rss_mb() -> float:
+    """Get the peak resident set size of this process and its finished children, in MB."""
+    peak_kb = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                  resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak_kb / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def _count_files(directory: str) -> int:
+    """Count the files in a directory tree."""
+    return sum(len(filenames) for _, _, filenames in os.walk(directory))
+
+
+def _build_corpus(corpus_dir: str, jobs: int) -> Dict[str, Any]:
+    """Cold-build a corpus; runs in a fresh process so peak RSS is per build."""
+    os.chdir(corpus_dir)
+    for directory in ('site', '.autosite-cache'):
+        if os.path.exists(directory):
+            shutil.rmtree(directory)
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        rendered = generate_site('config.yaml', 'site', jobs=jobs)
+        elapsed = time.perf_counter() - start
+
+    return {
+        'build_seconds': round(elapsed, 3),
+        'pages_rendered': rendered,
+        'pages_per_second': round(rendered / elapsed, 1),
+        'files_written': _count_files('site'),
+        'peak_rss_mb': round(_peak_rss_mb(), 1)
+    }
+
+
+def run_benchmark(posts: int, jobs: int = 1, repeat: int = 1, corpus_root: str = '.autosite-bench') -> Dict[str, Any]:
+    """
+    Build a synthetic corpus and measure the build.
+
+    Args:
+        posts: Number of posts in the corpus
+        jobs: Number of worker processes used to render pages
+        repeat: Number of builds; the fastest one is reported
+        corpus_root: Directory where corpora are generated and reused
+
+    Returns:
+        Build time, pages per second, files written and peak RSS of the run
+    """
+    corpus_dir = os.path.abspath(os.path.join(corpus_root, str(posts)))
+    generate_corpus(corpus_dir, posts)
+
+    runs = []
+    for _ in range(repeat):
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            runs.append(executor.submit(_build_corpus, corpus_dir, jobs).result())
+    best = min(runs, key=lambda run: run['build_seconds'])
+    return {'posts': posts, 'jobs': jobs, **best}
+
+
+def compare_results(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.1) -> List[str]:
+    """
+    Compare benchmark results with a baseline.
+
+    Runs are matched by corpus size and number of jobs.
+
+    Args:
+        results: Results written by this runner
+        baseline: Baseline results in the same format
+        tolerance: Allowed relative increase before a metric counts as a regression
+
+    Returns:
+        Description of every regression
+    """
+    baseline_runs = {(run['posts'], run['jobs']): run for run in baseline.get('runs', [])}
+    regressions = []
+    for run in results['runs']:
+        reference = baseline_runs.get((run['posts'], run['jobs']))
+        if reference is None:
+            continue
+        for metric in COMPARED_METRICS:
+            if reference[metric] and run[metric] > reference[metric] * (1 + tolerance):
+                change = (run[metric] / reference[metric] - 1) * 100
+                regressions.append(f"{run['posts']} posts, {run['jobs']} jobs: {metric} "
+                                   f"{reference[metric]} -> {run[metric]} (+{change:.0f}%)")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the site generator on synthetic corpora.')
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES, help='Corpus sizes (e.g. 1k 10k 100k)')
+    parser.add_argument('--jobs', type=int, default=1, help='Number of worker processes used to render pages')
+    parser.add_argument('--repeat', type=int, default=1, help='Builds per corpus; the fastest is reported')
+    parser.add_argument('--corpus-dir', default='.autosite-bench', help='Directory where corpora are generated')
+    parser.add_argument('--output', default='benchmark-results.json', help='Results file')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline results file to compare with')
+    parser.add_argument('--save-baseline', action='store_true', help='Store the results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='Allowed relative slowdown or memory growth (0.1 = 10%%)')
+    args = parser.parse_args()
+
+    results = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'runs': []
+    }
+    for posts in corpus_sizes(args.sizes):
+        print(f"Building {posts} posts with {args.jobs} jobs...")
+        run = run_benchmark(posts, args.jobs, args.repeat, args.corpus_dir)
+        results['runs'].append(run)
+        print(f"  {run['build_seconds']:.2f} s, {run['pages_per_second']:.0f} pages/s, "
+              f"{run['files_written']} files, peak RSS {run['peak_rss_mb']:.0f} MB")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        shutil.copyfile(args.output, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+    with open(args.baseline, encoding='utf-8') as f:
+        regressions = compare_results(results, json.load(f), args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+    if not regressions:
+        print(f"No regressions against {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,5 +5,9 @@ Core module for the static site generator.
 
 from .config import SiteConfig
 from .utils import slugify, extract_first_h1
+from .manifest import BuildManifest
+from .converter import MarkdownConverter
+from .cache import ConversionCache
 
-__all__ = ['SiteConfig', 'slugify', 'extract_first_h1']
+__all__ = ['SiteConfig', 'slugify', 'extract_first_h1', 'BuildManifest', 'MarkdownConverter',
+           'ConversionCache']
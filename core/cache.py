@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent cache of converted markdown for the static site generator.
+"""
+import os
+import time
+import sqlite3
+import threading
+from typing import Dict, Any, Optional, Tuple
+
+
+class ConversionCache:
+    """SQLite-backed cache mapping markdown content to converted HTML and metadata, with LRU eviction."""
+
+    FILENAME = 'markdown.sqlite'
+
+    def __init__(self, cache_dir: str = '.autosite-cache', max_size_mb: float = 256):
+        self.cache_dir = cache_dir
+        self.path = os.path.join(cache_dir, self.FILENAME)
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self._local = threading.local()
+        self._pid = os.getpid()
+        self._inherited: Optional[threading.local] = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Connections can't cross process boundaries, spawned workers open their own
+        return {'cache_dir': self.cache_dir, 'max_size_mb': self.max_size / (1024 * 1024)}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(**state)
+
+    def _thread_state(self) -> threading.local:
+        """Get the per-thread connections, dropping the ones a forked worker inherited from its parent."""
+        if self._pid != os.getpid():
+            # SQLite connections can't be used across fork. The inherited ones are kept referenced,
+            # never used or closed: closing them here could checkpoint the parent's database
+            self._inherited = self._local
+            self._local = threading.local()
+            self._pid = os.getpid()
+        return self._local
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get the connection of the current thread, opening the database on first use."""
+        conn = getattr(self._thread_state(), 'conn', None)
+        if conn is None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS conversions ('
+                ' key TEXT PRIMARY KEY,'
+                ' html TEXT NOT NULL,'
+                ' title TEXT,'
+                ' description TEXT,'
+                ' size INTEGER NOT NULL,'
+                ' last_used REAL NOT NULL)'
+            )
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Tuple[str, Optional[str], Optional[str]]]:
+        """
+        Look up a cached conversion and mark it as recently used.
+
+        Args:
+            key: Cache key of the conversion
+
+        Returns:
+            (html, title, description) or None on a cache miss
+        """
+        conn = self._connect()
+        row = conn.execute('SELECT html, title, description FROM conversions WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        conn.execute('UPDATE conversions SET last_used = ? WHERE key = ?', (time.time(), key))
+        return row
+
+    def put(self, key: str, html: str, title: Optional[str], description: Optional[str]) -> None:
+        """Store a conversion result."""
+        size = len(html) + len(title or '') + len(description or '')
+        self._connect().execute(
+            'INSERT OR REPLACE INTO conversions (key, html, title, description, size, last_used) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            (key, html, title, description, size, time.time())
+        )
+
+    def prune(self) -> int:
+        """
+        Evict least recently used entries until the cache fits its size cap.
+
+        Returns:
+            Number of evicted entries
+        """
+        if not os.path.exists(self.path):
+            return 0
+        conn = self._connect()
+        cursor = conn.execute(
+            'DELETE FROM conversions WHERE key IN ('
+            ' SELECT key FROM ('
+            '  SELECT key, SUM(size) OVER (ORDER BY last_used DESC, key) AS running FROM conversions'
+            ' ) WHERE running > ?)',
+            (self.max_size,)
+        )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        """Close the connection of the current thread."""
+        conn = getattr(self._thread_state(), 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+Precompressed .gz and .br sidecars of the text outputs, for servers that serve them as is.
+"""
+import os
+import gzip
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+from .manifest import BuildManifest
+from .utils import hash_inputs
+
+try:
+    import brotli
+except ImportError:  # Optional dependency, only .gz sidecars are written
+    brotli = None
+
+
+TEXT_EXTENSIONS = ('.html', '.css', '.js', '.json', '.xml', '.txt', '.svg')
+
+
+def is_public_text(rel_path: str) -> bool:
+    """Check whether an output is a text file served to visitors (not a dotfile or inside a dot directory)."""
+    return rel_path.endswith(TEXT_EXTENSIONS) and not any(part.startswith('.') for part in rel_path.split('/'))
+
+
+def brotli_available() -> bool:
+    """Check whether the brotli module is installed."""
+    return brotli is not None
+
+
+def _gzip(data: bytes) -> bytes:
+    # No timestamp in the header, so identical inputs give identical sidecars
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _brotli(data: bytes) -> bytes:
+    return brotli.compress(data, quality=11)
+
+
+class Precompressor:
+    """
+    Writes compressed siblings (page.html.gz, page.html.br) of the text outputs.
+
+    Compression runs on a thread pool; zlib and brotli release the GIL
+    while compressing. A sidecar is recorded in the manifest with the hash
+    of its source, so it is reused as long as the source is byte-identical
+    to the one it was compressed from.
+    """
+
+    # Outputs smaller than this aren't worth a compressed copy
+    MIN_SIZE = 1024
+
+    def __init__(self, output_dir: str, manifest: BuildManifest, min_size: int = MIN_SIZE,
+                 threads: Optional[int] = None):
+        self.output_dir = output_dir
+        self.manifest = manifest
+        self.min_size = min_size
+        self.threads = threads or os.cpu_count() or 1
+        self.compressors: List[Tuple[str, Callable[[bytes], bytes]]] = [('.gz', _gzip)]
+        if brotli is not None:
+            self.compressors.append(('.br', _brotli))
+
+    def compress(self) -> Tuple[int, int]:
+        """
+        Compress the public text outputs written with new content during this build.
+
+        Outputs left untouched keep the sidecars recorded by the previous
+        build without being read again, so the cost follows the size of the
+        change rather than of the site. Sidecars that don't come out smaller
+        than their source are skipped.
+
+        Returns:
+            Number of sidecars written and number reused from the previous build
+        """
+        tasks = []
+        reused = 0
+        for rel_path in self.manifest.outputs():
+            if not is_public_text(rel_path):
+                continue
+            suffixes = [suffix for suffix, _ in self.compressors]
+            if not self.manifest.is_changed(rel_path):
+                kept = [suffix for suffix in suffixes if self._keep_sidecar(rel_path + suffix)]
+                reused += len(kept)
+                suffixes = [suffix for suffix in suffixes if suffix not in kept]
+            if suffixes:
+                tasks.append((rel_path, suffixes))
+
+        written = 0
+        with ThreadPoolExecutor(max_workers=self.threads) as pool:
+            for sidecars in pool.map(lambda task: self._compress_output(*task), tasks):
+                for rel_path, digest, changed in sidecars:
+                    self.manifest.record(rel_path, digest)
+                    if changed is None:
+                        reused += 1
+                        continue
+                    written += 1
+                    if changed:
+                        self.manifest.mark_changed(rel_path)
+        return written, reused
+
+    def _keep_sidecar(self, rel_path: str) -> bool:
+        """Keep a sidecar of an unchanged output, if the previous build wrote it and it's still there."""
+        return (os.path.isfile(os.path.join(self.output_dir, rel_path))
+                and self.manifest.keep_previous(rel_path))
+
+    def _compress_output(self, rel_path: str, suffixes: List[str]) -> List[Tuple[str, str, Optional[bool]]]:
+        """
+        Write the sidecars of one output.
+
+        Args:
+            rel_path: Output path relative to the output directory
+            suffixes: Sidecars to write ('.gz', '.br')
+
+        Returns:
+            (sidecar path, source hash, whether its content changed, or None
+            if it was reused) of each sidecar
+        """
+        path = os.path.join(self.output_dir, rel_path)
+        try:
+            if os.path.getsize(path) < self.min_size:
+                return []
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return []
+
+        digest = hash_inputs(data)
+        sidecars = []
+        for suffix, compressor in self.compressors:
+            if suffix not in suffixes:
+                continue
+            sidecar_path = path + suffix
+            if self.manifest.previous_matches(rel_path + suffix, digest) and os.path.isfile(sidecar_path):
+                sidecars.append((rel_path + suffix, digest, None))
+                continue
+            compressed = compressor(data)
+            if len(compressed) >= len(data):
+                continue
+            sidecars.append((rel_path + suffix, digest, _write_if_changed(sidecar_path, compressed)))
+        return sidecars
+
+
+def _write_if_changed(path: str, data: bytes) -> bool:
+    """Write a binary file unless it already has this content, replacing it rather than truncating it."""
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
@@ -3,7 +3,10 @@
 Configuration management for static site generator.
 """
 import yaml
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+from urllib.parse import urlparse
+
+from .utils import hash_inputs
 
 
 class SiteConfig:
@@ -36,6 +39,15 @@ class SiteConfig:
             base_url += '/'
         return base_url
     
+    @property
+    def site_url(self) -> Optional[str]:
+        """Get the absolute URL of the site root, from site_url or an absolute base_url (None if unset)."""
+        for url in (self._config.get('site_url', ''), self.base_url):
+            parsed = urlparse(url or '')
+            if parsed.scheme in ('http', 'https') and parsed.netloc:
+                return url if url.endswith('/') else url + '/'
+        return None
+    
     @property
     def homepage(self) -> str:
         """Get homepage markdown file path."""
@@ -57,13 +69,92 @@ class SiteConfig:
         }
     
     @property
-    def assets(self) -> Dict[str, str]:
+    def assets(self) -> Dict[str, Any]:
         """Get assets configuration with defaults."""
         assets = self._config.get('assets', {})
         return {
-            'source_dir': assets.get('source_dir', 'assets')
+            'source_dir': assets.get('source_dir', 'assets'),
+            'hardlink': assets.get('hardlink', False),
+            'fingerprint': assets.get('fingerprint', False),
+            'subset_fonts': assets.get('subset_fonts', False)
+        }
+    
+    @property
+    def templates_dir(self) -> str:
+        """Get the directory of user templates overriding the built-in ones."""
+        return self._config.get('templates_dir', 'layouts')
+    
+    @property
+    def markdown(self) -> Dict[str, Any]:
+        """Get markdown conversion configuration with defaults."""
+        markdown_config = self._config.get('markdown', {})
+        return {
+            'extensions': markdown_config.get('extensions', ['fenced_code']),
+            'extension_configs': markdown_config.get('extension_configs', {})
+        }
+    
+    @property
+    def highlight(self) -> Dict[str, Any]:
+        """Get build-time syntax highlighting configuration with defaults."""
+        highlight = self._config.get('highlight')
+        options = highlight if isinstance(highlight, dict) else {}
+        return {
+            'enabled': bool(highlight),
+            'style': options.get('style', 'default')
+        }
+    
+    @property
+    def images(self) -> Dict[str, Any]:
+        """Get responsive image configuration with defaults."""
+        images = self._config.get('images')
+        options = images if isinstance(images, dict) else {}
+        return {
+            'enabled': bool(images),
+            'widths': options.get('widths', [480, 960, 1440]),
+            'sizes': options.get('sizes', '(max-width: 1000px) 100vw, 1000px'),
+            'quality': options.get('quality', 82)
         }
     
+    @property
+    def cache(self) -> Dict[str, Any]:
+        """Get build cache configuration with defaults."""
+        cache = self._config.get('cache', {})
+        return {
+            'dir': cache.get('dir', '.autosite-cache'),
+            'max_size_mb': cache.get('max_size_mb', 256)
+        }
+    
+    @property
+    def sitemap(self) -> bool:
+        """Check whether sitemap.xml should be generated."""
+        return bool(self._config.get('sitemap', False))
+    
+    @property
+    def stable_pagination(self) -> bool:
+        """Check whether archive pages are numbered from the oldest posts."""
+        return bool(self._config.get('stable_pagination', False))
+    
+    @property
+    def search(self) -> bool:
+        """Check whether the client-side search index should be generated."""
+        return bool(self._config.get('search', False))
+    
+    @property
+    def feeds(self) -> Dict[str, Any]:
+        """Get collection feed configuration with defaults."""
+        feeds = self._config.get('feeds')
+        options = feeds if isinstance(feeds, dict) else {}
+        return {
+            'enabled': bool(feeds),
+            'format': options.get('format', 'atom'),
+            'limit': options.get('limit', 20)
+        }
+    
+    @property
+    def pages_hash(self) -> str:
+        """Get a hash of the configuration rendered pages depend on (theme and cache settings excluded)."""
+        return hash_inputs({key: value for key, value in self._config.items() if key not in ('theme', 'cache')})
+    
     def get(self, key: str, default: Any = None) -> Any:
         """Get configuration value by key."""
         return self._config.get(key, default)
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Content discovery with a shared stat cache.
+"""
+import os
+import stat
+from typing import Dict, Iterable, List, Optional
+
+
+class ContentIndex:
+    """
+    Walks the content tree once with os.scandir and caches what it finds.
+
+    Navigation, page generation and the incremental checks all ask the index
+    instead of the filesystem, so every source is stat'ed once per build.
+    Paths that were not scanned are stat'ed on first use and cached too.
+    """
+
+    def __init__(self):
+        self._stats: Dict[str, Optional[os.stat_result]] = {}
+        # Entries of every scanned directory, in scandir order
+        self._children: Dict[str, List[str]] = {}
+
+    def scan(self, paths: Iterable[str]) -> None:
+        """
+        Scan content files and directory trees.
+
+        Args:
+            paths: Files, or directories scanned recursively (symlinked
+                directories are listed but not descended into)
+        """
+        for path in paths:
+            if self.is_dir(path):
+                self._scan_tree(os.path.normpath(path))
+
+    def _scan_tree(self, root: str) -> None:
+        """Cache the stat results of every entry below a directory."""
+        pending = [root]
+        while pending:
+            directory = pending.pop()
+            if directory in self._children:
+                continue
+            children = []
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        # Keys are normalized paths, like those passed to stat()
+                        path = entry.name if directory == os.curdir else entry.path
+                        try:
+                            self._stats[path] = entry.stat()
+                        except FileNotFoundError:
+                            continue
+                        children.append(path)
+                        if entry.is_dir() and not entry.is_symlink():
+                            pending.append(path)
+            except (FileNotFoundError, NotADirectoryError):
+                pass
+            self._children[directory] = children
+
+    def stat(self, path: str) -> Optional[os.stat_result]:
+        """
+        Get the cached stat result of a path.
+
+        Returns:
+            Stat result, or None if the path doesn't exist
+        """
+        path = os.path.normpath(path)
+        try:
+            return self._stats[path]
+        except KeyError:
+            pass
+        try:
+            result = os.stat(path)
+        except (FileNotFoundError, NotADirectoryError):
+            result = None
+        self._stats[path] = result
+        return result
+
+    def is_file(self, path: str) -> bool:
+        """Check whether a path is an existing file."""
+        result = self.stat(path)
+        return result is not None and stat.S_ISREG(result.st_mode)
+
+    def is_dir(self, path: str) -> bool:
+        """Check whether a path is an existing directory."""
+        result = self.stat(path)
+        return result is not None and stat.S_ISDIR(result.st_mode)
+
+    def files(self, directory: str, extension: str) -> List[str]:
+        """
+        List the files with an extension in a directory tree.
+
+        Args:
+            directory: Directory to list, including its subdirectories
+            extension: File extension, e.g. '.md'
+
+        Returns:
+            File paths, in no particular order
+        """
+        root = os.path.normpath(directory)
+        self._scan_tree(root)
+        found = []
+        pending = [root]
+        while pending:
+            for path in self._children.get(pending.pop(), ()):
+                if path in self._children:
+                    pending.append(path)
+                elif path.endswith(extension) and self.is_file(path):
+                    found.append(path)
+        return found
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+Markdown conversion engine for the static site generator.
+"""
+import re
+import html
+import threading
+from typing import Dict, List, Any, Optional, NamedTuple
+import markdown
+from markdown.extensions import Extension
+from markdown.treeprocessors import Treeprocessor
+
+from .cache import ConversionCache
+from .highlight import CodeHighlighter, CodeHighlightExtension
+from .images import ResponsiveImages, ResponsiveImageExtension
+from .utils import hash_inputs
+
+
+DEFAULT_EXTENSIONS = ['fenced_code']
+
+# Bumped when the extracted heading metadata changes, so cached conversions aren't reused
+METADATA_VERSION = 3
+
+# Placeholders left in the tree for stashed raw HTML
+_PLACEHOLDER_RE = re.compile('\x02wzxhzdk:(\\d+)\x03')
+
+
+class ConversionResult(NamedTuple):
+    """HTML and metadata produced by a single markdown conversion."""
+    html: str
+    title: Optional[str]
+    description: Optional[str]
+
+
+class _HeadingTreeprocessor(Treeprocessor):
+    """Records the plain text of the first H1 and H2 of the parsed document."""
+
+    def _stashed_text(self, match: 're.Match') -> str:
+        """Get the text of a raw HTML placeholder: entities are kept, inline tags dropped."""
+        raw = self.md.htmlStash.rawHtmlBlocks[int(match.group(1))]
+        return '' if raw.startswith('<') else raw
+
+    def run(self, root):
+        for element in root.iter():
+            if element.tag not in ('h1', 'h2'):
+                continue
+            attr = 'first_h1' if element.tag == 'h1' else 'first_h2'
+            if getattr(self.md, attr) is None:
+                text = _PLACEHOLDER_RE.sub(self._stashed_text, ''.join(element.itertext()))
+                setattr(self.md, attr, html.unescape(text).strip() or None)
+            if self.md.first_h1 is not None and self.md.first_h2 is not None:
+                break
+
+
+class HeadingMetadataExtension(Extension):
+    """Extracts title (first H1) and description (first H2) while converting."""
+
+    def extendMarkdown(self, md):
+        md.registerExtension(self)
+        self.md = md
+        self.reset()
+        # Run after inline processing and unescaping so the heading text is final
+        md.treeprocessors.register(_HeadingTreeprocessor(md), 'heading_metadata', -10)
+
+    def reset(self):
+        self.md.first_h1 = None
+        self.md.first_h2 = None
+
+
+class MarkdownConverter:
+    """Converts markdown to HTML reusing one warm Markdown instance per thread."""
+
+    def __init__(self, extensions: Optional[List[str]] = None,
+                 extension_configs: Optional[Dict[str, Dict[str, Any]]] = None,
+                 cache: Optional[ConversionCache] = None, highlight_style: Optional[str] = None,
+                 images: Optional[ResponsiveImages] = None):
+        self.extensions = list(DEFAULT_EXTENSIONS if extensions is None else extensions)
+        self.extension_configs = extension_configs or {}
+        self.cache = cache
+        # Fenced code blocks are highlighted at build time when a Pygments style is set
+        self.highlighter = CodeHighlighter(highlight_style, cache) if highlight_style else None
+        self.images = images
+        self._local = threading.local()
+        # Conversions depend on the extension set and the library version too
+        namespace = [self.extensions, self.extension_configs, markdown.__version__, METADATA_VERSION]
+        if self.highlighter is not None:
+            namespace.append(self.highlighter.cache_namespace)
+        if self.images is not None:
+            namespace.append(self.images.cache_namespace)
+        self._cache_namespace = hash_inputs(*namespace)
+
+    def _get_markdown(self) -> markdown.Markdown:
+        """Get the Markdown instance of the current thread, creating it on first use."""
+        md = getattr(self._local, 'md', None)
+        if md is None:
+            extensions = self.extensions + [HeadingMetadataExtension()]
+            if self.highlighter is not None:
+                extensions.append(CodeHighlightExtension(self.highlighter))
+            if self.images is not None:
+                extensions.append(ResponsiveImageExtension(self.images))
+            md = markdown.Markdown(extensions=extensions, extension_configs=self.extension_configs)
+            self._local.md = md
+        return md
+
+    def convert(self, md_content: str) -> ConversionResult:
+        """
+        Convert markdown content to HTML.
+
+        Args:
+            md_content: Markdown content to convert
+
+        Returns:
+            Converted HTML with the first H1 and H2 heading texts
+        """
+        key = None
+        if self.cache is not None:
+            key = hash_inputs(self._cache_namespace, md_content)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return ConversionResult(*cached)
+
+        md = self._get_markdown()
+        try:
+            result = ConversionResult(md.convert(md_content), md.first_h1, md.first_h2)
+        finally:
+            md.reset()
+
+        if key is not None:
+            self.cache.put(key, *result)
+        return result
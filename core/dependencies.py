@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Dependency graph between build inputs and generated outputs.
+"""
+import os
+from typing import Dict, Iterable, Set
+
+
+class DependencyGraph:
+    """Records which inputs every output is built from, and which build unit produces it."""
+
+    def __init__(self):
+        self._dependents: Dict[str, Set[str]] = {}
+        self._unit_outputs: Dict[str, Set[str]] = {}
+        self._output_units: Dict[str, str] = {}
+
+    def add(self, unit: str, output: str, inputs: Iterable[str]) -> None:
+        """
+        Register an output and the inputs it depends on.
+
+        Args:
+            unit: Build unit producing the output (e.g. the configured page path)
+            output: Output path relative to the output directory
+            inputs: Source files or directories the output is built from
+        """
+        self._unit_outputs.setdefault(unit, set()).add(output)
+        self._output_units[output] = unit
+        for path in inputs:
+            self._dependents.setdefault(os.path.normpath(path), set()).add(output)
+
+    def has_input(self, path: str) -> bool:
+        """Check whether any output depends on a path."""
+        return bool(self._dependents.get(os.path.normpath(path)))
+
+    def clear(self) -> None:
+        """Forget every registered dependency."""
+        self._dependents.clear()
+        self._unit_outputs.clear()
+        self._output_units.clear()
+
+    def clear_unit(self, unit: str) -> Set[str]:
+        """
+        Forget the outputs of a unit before it is rebuilt.
+
+        Returns:
+            Outputs the unit produced before
+        """
+        outputs = self._unit_outputs.pop(unit, set())
+        for output in outputs:
+            self._output_units.pop(output, None)
+        for dependents in self._dependents.values():
+            dependents.difference_update(outputs)
+        return outputs
+
+    def affected_outputs(self, changed_paths: Iterable[str]) -> Set[str]:
+        """
+        Find the outputs depending on changed paths.
+
+        A path also affects the outputs depending on any of its parent
+        directories, so added or removed files reach their collection.
+
+        Args:
+            changed_paths: Added, modified or removed source paths
+
+        Returns:
+            Affected output paths
+        """
+        affected = set()
+        for path in changed_paths:
+            path = os.path.normpath(path)
+            while True:
+                affected.update(self._dependents.get(path, ()))
+                parent = os.path.dirname(path)
+                if not parent or parent == path:
+                    break
+                path = parent
+        return affected
+
+    def affected_units(self, changed_paths: Iterable[str]) -> Set[str]:
+        """Find the build units that must run again for changed paths."""
+        return {self._output_units[output] for output in self.affected_outputs(changed_paths)}
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Font subsetting: custom fonts are cut down to the glyphs the site uses and shipped as WOFF2.
+"""
+import os
+import re
+import json
+from typing import Dict, Iterable, List, Optional, Set
+
+from .utils import hash_inputs, write_output
+
+try:
+    import fontTools
+    from fontTools import subset
+    import brotli  # noqa: F401 -- needed by fontTools to write WOFF2
+except ImportError:  # Optional dependencies, fonts are shipped as they are
+    fontTools = subset = None
+
+
+# Always kept, for text that scripts insert at runtime (e.g. search queries)
+BASE_CHARACTERS = ''.join(chr(code) for code in range(0x20, 0x7f))
+
+_FONT_FACE_RE = re.compile(r'@font-face\s*\{[^}]*\}')
+_FONT_SRC_RE = re.compile(r'''url\((['"]?)([^'")]+\.(?:ttf|otf))\1\)\s*format\((['"])(?:truetype|opentype)\3\)''')
+
+
+def subsetting_available() -> bool:
+    """Check whether fontTools and brotli are installed."""
+    return subset is not None
+
+
+class FontSubsetter:
+    """Subsets the custom fonts to the glyphs of the rendered pages, caching each subset."""
+
+    STATE_FILE = 'glyphs.json'
+
+    def __init__(self, source_assets_dir: str, cache_dir: str, incremental: bool = False):
+        self.source_assets_dir = source_assets_dir
+        self.cache_dir = os.path.join(cache_dir, 'fonts')
+        self.state_path = os.path.join(self.cache_dir, self.STATE_FILE)
+        # Fonts (paths relative to the assets dir) referenced by @font-face rules
+        self.fonts: List[str] = []
+        self.glyphs: Set[str] = set(BASE_CHARACTERS)
+        if incremental:
+            # Skipped pages aren't scanned again, so the glyph set only grows between full builds
+            self.glyphs.update(self._load())
+
+    def _load(self) -> str:
+        """Load the glyphs used by the previous build, if any."""
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                return json.load(f).get('glyphs', '')
+        except (FileNotFoundError, ValueError):
+            return ''
+
+    @staticmethod
+    def woff2_name(font: str) -> str:
+        """Get the output name of the subset of a font."""
+        return os.path.splitext(font)[0] + '.woff2'
+
+    @property
+    def primary_font(self) -> Optional[str]:
+        """Get the subset of the first font referenced by the stylesheets, to preload it."""
+        return self.woff2_name(self.fonts[0]) if self.fonts else None
+
+    def rewrite_css(self, css: str, css_rel_dir: str) -> str:
+        """
+        Point the @font-face rules of a stylesheet to the WOFF2 subsets.
+
+        The original font stays listed as a fallback, and rules without a
+        font-display descriptor get 'font-display: swap'.
+
+        Args:
+            css: Stylesheet content
+            css_rel_dir: Directory of the stylesheet, relative to the assets dir
+
+        Returns:
+            Rewritten stylesheet
+        """
+        def rewrite_source(match: 're.Match') -> str:
+            url = match.group(2)
+            font = os.path.normpath(os.path.join(css_rel_dir, url)).replace(os.sep, '/')
+            if not os.path.isfile(os.path.join(self.source_assets_dir, font)):
+                return match.group(0)
+            if font not in self.fonts:
+                self.fonts.append(font)
+            quote = match.group(1) or "'"
+            return f"url({quote}{self.woff2_name(url)}{quote}) format('woff2'), {match.group(0)}"
+
+        def rewrite_rule(match: 're.Match') -> str:
+            rule = _FONT_SRC_RE.sub(rewrite_source, match.group(0))
+            if 'font-display' not in rule:
+                rule = rule[:-1].rstrip() + '\n    font-display: swap;\n}'
+            return rule
+
+        return _FONT_FACE_RE.sub(rewrite_rule, css)
+
+    def add_glyphs(self, text: Iterable[str]) -> None:
+        """Add the characters of rendered text to the glyph set."""
+        self.glyphs.update(text)
+
+    def subset_fonts(self) -> Dict[str, str]:
+        """
+        Subset every referenced font to the glyph set.
+
+        Subsets are cached by font content and glyph set, so an unchanged
+        glyph set never runs the subsetter again.
+
+        Returns:
+            Mapping of subset name (relative to the assets dir) to the cached subset
+        """
+        glyphs = ''.join(sorted(self.glyphs))
+        os.makedirs(self.cache_dir, exist_ok=True)
+        subsets = {}
+        for font in self.fonts:
+            source_path = os.path.join(self.source_assets_dir, font)
+            with open(source_path, 'rb') as f:
+                font_hash = hash_inputs(f.read())
+            subset_hash = hash_inputs(font_hash, glyphs, fontTools.version)
+            cached_path = os.path.join(self.cache_dir, f'{subset_hash}.woff2')
+            if not os.path.isfile(cached_path):
+                self._subset(source_path, glyphs, cached_path)
+            subsets[self.woff2_name(font)] = cached_path
+
+        write_output(self.state_path, json.dumps({'glyphs': glyphs}, ensure_ascii=False))
+        return subsets
+
+    @staticmethod
+    def _subset(source_path: str, glyphs: str, dest_path: str) -> None:
+        """Subset a font to a set of characters and save it as WOFF2."""
+        options = subset.Options()
+        options.flavor = 'woff2'
+        options.layout_features = ['*']
+        font = subset.load_font(source_path, options)
+        try:
+            subsetter = subset.Subsetter(options)
+            subsetter.populate(unicodes=[ord(char) for char in glyphs])
+            subsetter.subset(font)
+            tmp_path = dest_path + '.tmp'
+            subset.save_font(font, tmp_path, options)
+            os.replace(tmp_path, dest_path)
+        finally:
+            font.close()
+
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Build-time syntax highlighting of fenced code blocks with Pygments.
+"""
+import re
+import html
+from typing import Optional
+from markdown.extensions import Extension
+from markdown.postprocessors import Postprocessor
+
+from .cache import ConversionCache
+from .utils import hash_inputs
+
+try:
+    import pygments
+    from pygments import highlight
+    from pygments.formatters import HtmlFormatter
+    from pygments.lexers import get_lexer_by_name
+    from pygments.util import ClassNotFound
+except ImportError:  # Optional dependency, pages fall back to client-side highlighting
+    pygments = None
+
+
+# Fenced code blocks with a language, as written by the fenced_code extension
+_CODE_BLOCK_RE = re.compile(r'<pre><code class="language-([\w#+.-]+)">(.*?)</code></pre>', re.DOTALL)
+
+
+def highlighting_available() -> bool:
+    """Check whether Pygments is installed."""
+    return pygments is not None
+
+
+def highlight_stylesheet(style: str) -> str:
+    """
+    Generate the stylesheet of a Pygments style for highlighted blocks.
+
+    Args:
+        style: Pygments style name (e.g. 'default', 'monokai')
+
+    Returns:
+        CSS rules scoped to the .highlight class
+    """
+    return HtmlFormatter(style=style).get_style_defs('.highlight') + '\n'
+
+
+class CodeHighlighter:
+    """Highlights the fenced code blocks of converted HTML, caching each highlighted block."""
+
+    def __init__(self, style: str, cache: Optional[ConversionCache] = None):
+        self.style = style
+        self.cache = cache
+        self._formatter = HtmlFormatter(style=style, nowrap=True)
+        # Blocks depend on the language, the code, the style and the Pygments version
+        self.cache_namespace = hash_inputs('highlight', style, pygments.__version__)
+
+    def highlight_html(self, page_html: str) -> str:
+        """Replace every fenced code block with a known language by its highlighted version."""
+        return _CODE_BLOCK_RE.sub(self._highlight_block, page_html)
+
+    def _highlight_block(self, match: 're.Match') -> str:
+        """Highlight one code block, or keep it as is if the language is unknown."""
+        language, escaped_code = match.groups()
+        code = html.unescape(escaped_code)
+
+        key = None
+        if self.cache is not None:
+            key = hash_inputs(self.cache_namespace, language, code)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached[0]
+
+        try:
+            lexer = get_lexer_by_name(language)
+        except ClassNotFound:
+            return match.group(0)
+        highlighted = (f'<pre class="highlight"><code class="language-{language}">'
+                       f'{highlight(code, lexer, self._formatter)}</code></pre>')
+
+        if key is not None:
+            self.cache.put(key, highlighted, None, None)
+        return highlighted
+
+
+class _HighlightPostprocessor(Postprocessor):
+    """Highlights code blocks once the fenced_code output is back in the HTML."""
+
+    def __init__(self, md, highlighter: CodeHighlighter):
+        super().__init__(md)
+        self.highlighter = highlighter
+
+    def run(self, text):
+        return self.highlighter.highlight_html(text)
+
+
+class CodeHighlightExtension(Extension):
+    """Highlights fenced code blocks at build time instead of in the browser."""
+
+    def __init__(self, highlighter: CodeHighlighter, **kwargs):
+        self.highlighter = highlighter
+        super().__init__(**kwargs)
+
+    def extendMarkdown(self, md):
+        md.registerExtension(self)
+        # After raw HTML (fenced code blocks are stashed) is restored
+        md.postprocessors.register(_HighlightPostprocessor(md, self.highlighter), 'code_highlight', 5)
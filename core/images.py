@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+Responsive images: resized variants of the asset images, and srcset/sizes on the images of converted pages.
+"""
+import os
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import unquote, urlparse
+from markdown.extensions import Extension
+from markdown.treeprocessors import Treeprocessor
+
+from .utils import hash_inputs
+
+try:
+    import PIL
+    from PIL import Image, ImageOps
+except ImportError:  # Optional dependency, images are linked as they are
+    PIL = None
+
+
+# EXIF orientations that rotate the image by 90 degrees
+_ROTATED_ORIENTATIONS = (5, 6, 7, 8)
+_ORIENTATION_TAG = 0x0112
+
+
+def images_available() -> bool:
+    """Check whether Pillow is installed."""
+    return PIL is not None
+
+
+def variant_path(path: str, width: int) -> str:
+    """Get the path of the variant of an image resized to a width (e.g. photo-480w.jpg)."""
+    root, ext = posixpath.splitext(path)
+    return f'{root}-{width}w{ext}'
+
+
+class ImageInfo(NamedTuple):
+    """Dimensions of an image and the widths of its resized variants."""
+    width: int
+    height: int
+    variants: Tuple[int, ...]
+
+
+class ImageProcessor:
+    """
+    Resizes the images of the assets directory to a set of widths.
+
+    Variants are kept in a persistent cache keyed by the hash of the source
+    image and the variant size, so unchanged images are never resized
+    again. Images are processed by a thread pool; Pillow releases the GIL
+    while decoding, resizing and encoding.
+    """
+
+    # Animated GIFs and vector images are linked as they are
+    EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+    def __init__(self, source_assets_dir: str, cache_dir: str, widths: Iterable[int], quality: int = 82,
+                 threads: Optional[int] = None):
+        self.source_assets_dir = source_assets_dir
+        self.cache_dir = os.path.join(cache_dir, 'images')
+        self.widths = sorted(set(widths))
+        self.quality = quality
+        self.threads = threads or os.cpu_count() or 1
+
+    def process(self) -> Tuple[Dict[str, ImageInfo], Dict[str, str]]:
+        """
+        Create the missing variants of every image.
+
+        Returns:
+            Dimensions of each image, and the cached file of each variant,
+            both keyed by output path (e.g. 'assets/photo.jpg')
+        """
+        sources = []
+        for dirpath, dirnames, filenames in os.walk(self.source_assets_dir):
+            dirnames.sort()
+            rel_dir = os.path.relpath(dirpath, self.source_assets_dir)
+            sources += [os.path.normpath(os.path.join(rel_dir, filename)).replace(os.sep, '/')
+                        for filename in sorted(filenames) if filename.lower().endswith(self.EXTENSIONS)]
+        if not sources:
+            return {}, {}
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        images, variants = {}, {}
+        with ThreadPoolExecutor(max_workers=self.threads) as pool:
+            for source, result in zip(sources, pool.map(self._process_image, sources)):
+                if result is None:
+                    continue
+                info, cached_variants = result
+                images[f'assets/{source}'] = info
+                for width, cached_path in cached_variants.items():
+                    variants[variant_path(f'assets/{source}', width)] = cached_path
+        return images, variants
+
+    def _process_image(self, source: str) -> Optional[Tuple[ImageInfo, Dict[int, str]]]:
+        """Read the dimensions of one image and create its missing variants."""
+        path = os.path.join(self.source_assets_dir, source)
+        try:
+            with open(path, 'rb') as f:
+                source_hash = hash_inputs(f.read())
+            with Image.open(path) as image:
+                width, height = image.size
+                if image.getexif().get(_ORIENTATION_TAG, 1) in _ROTATED_ORIENTATIONS:
+                    width, height = height, width
+
+                ext = os.path.splitext(source)[1].lower()
+                cached = {}
+                upright = None
+                for variant_width in (w for w in self.widths if w < width):
+                    variant_key = hash_inputs(source_hash, variant_width, self.quality, PIL.__version__)
+                    cached_path = os.path.join(self.cache_dir, f'{variant_key}{ext}')
+                    if not os.path.isfile(cached_path):
+                        if upright is None:
+                            upright = self._prepare(image)
+                        self._resize(upright, variant_width, round(height * variant_width / width), cached_path)
+                    cached[variant_width] = cached_path
+        except (OSError, SyntaxError, ValueError) as e:
+            # Pillow reports unreadable or truncated images with these
+            print(f"Warning: skipping image '{path}': {e}")
+            return None
+        return ImageInfo(width, height, tuple(cached)), cached
+
+    @staticmethod
+    def _prepare(image: 'Image.Image') -> 'Image.Image':
+        """Apply the EXIF orientation and switch palette images to a mode that resamples smoothly."""
+        upright = ImageOps.exif_transpose(image)
+        if upright.mode in ('P', '1'):
+            upright = upright.convert('RGBA')
+        return upright
+
+    def _resize(self, image: 'Image.Image', width: int, height: int, dest_path: str) -> None:
+        """Write a resized copy of an image, in the format given by the destination extension."""
+        resized = image.resize((width, height), Image.LANCZOS)
+        options = {'icc_profile': image.info.get('icc_profile')}
+        if dest_path.endswith(('.jpg', '.jpeg')):
+            if resized.mode not in ('RGB', 'L'):
+                resized = resized.convert('RGB')
+            options.update(format='JPEG', quality=self.quality, optimize=True, progressive=True)
+        elif dest_path.endswith('.webp'):
+            options.update(format='WEBP', quality=self.quality, method=6)
+        else:
+            options.update(format='PNG', optimize=True)
+        tmp_path = dest_path + '.tmp'
+        resized.save(tmp_path, **options)
+        os.replace(tmp_path, dest_path)
+
+
+class ResponsiveImages:
+    """Adds srcset, sizes, dimensions and lazy loading to the images of converted pages."""
+
+    def __init__(self, images: Dict[str, ImageInfo], sizes: str, base_url: str = '/'):
+        self.images = images
+        self.sizes = sizes
+        self.base_path = urlparse(base_url).path or '/'
+        # Conversions depend on the dimensions and variants of every image
+        self.cache_namespace = hash_inputs('images', sorted(images.items()), sizes, self.base_path)
+
+    def _asset_path(self, src: str) -> Optional[str]:
+        """Get the output path of a local image from its src attribute."""
+        parsed = urlparse(src)
+        if parsed.scheme or parsed.netloc or parsed.query:
+            return None
+        path = unquote(parsed.path)
+        if path.startswith(self.base_path):
+            path = path[len(self.base_path):]
+        elif path.startswith('/'):
+            return None
+        path = posixpath.normpath(path)
+        # Assets live at the site root, whatever page links them
+        while path.startswith('../'):
+            path = path[3:]
+        return path
+
+    def rewrite(self, attrib: Dict[str, str]) -> None:
+        """
+        Update the attributes of an img element in place.
+
+        Args:
+            attrib: Attributes of the element; images without a known source
+                only get loading="lazy"
+        """
+        attrib.setdefault('loading', 'lazy')
+        src = attrib.get('src', '')
+        info = self.images.get(self._asset_path(src))
+        if info is None:
+            return
+        attrib.setdefault('width', str(info.width))
+        attrib.setdefault('height', str(info.height))
+        if info.variants and 'srcset' not in attrib:
+            candidates: List[str] = [f'{variant_path(src, width)} {width}w' for width in info.variants]
+            attrib['srcset'] = ', '.join(candidates + [f'{src} {info.width}w'])
+            attrib['sizes'] = self.sizes
+
+
+class _ResponsiveImageTreeprocessor(Treeprocessor):
+    """Rewrites the img elements of the parsed document."""
+
+    def __init__(self, md, images: ResponsiveImages):
+        super().__init__(md)
+        self.images = images
+
+    def run(self, root):
+        for element in root.iter('img'):
+            self.images.rewrite(element.attrib)
+
+
+class ResponsiveImageExtension(Extension):
+    """Serves resized variants of the asset images to smaller screens."""
+
+    def __init__(self, images: ResponsiveImages, **kwargs):
+        self.images = images
+        super().__init__(**kwargs)
+
+    def extendMarkdown(self, md):
+        md.registerExtension(self)
+        # After inline processing has created the img elements
+        md.treeprocessors.register(_ResponsiveImageTreeprocessor(md, self.images), 'responsive_images', 5)
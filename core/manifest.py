@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+Build manifest for incremental builds.
+"""
+import os
+import json
+from typing import Dict, List, Any, Optional, Set
+
+from .utils import hash_inputs, write_output
+
+
+class BuildManifest:
+    """Tracks the input hash of every generated output between builds."""
+
+    # Kept in the build state dir (under the cache dir), out of the published site
+    FILENAME = 'manifest.json'
+    # Added, changed and deleted URLs of the last build, for deploy tooling (next to the manifest by default)
+    CHANGES_FILENAME = 'changes.json'
+
+    def __init__(self, output_dir: str, state_dir: str, incremental: bool = False, global_hash: str = ''):
+        self.output_dir = output_dir
+        self.state_dir = state_dir
+        self.incremental = incremental
+        self.global_hash = global_hash
+        self.path = os.path.join(state_dir, self.FILENAME)
+        self.changes_path = os.path.join(state_dir, self.CHANGES_FILENAME)
+        previous = self._load()
+        # Outputs of the previous build still present in the output dir
+        self._previous_outputs: Dict[str, str] = previous.get('outputs', {})
+        # Entries that can be reused to skip rendering
+        reusable = incremental and previous.get('global_hash') == global_hash
+        self._previous: Dict[str, str] = self._previous_outputs if reusable else {}
+        self._previous_metadata: Dict[str, Dict[str, Any]] = previous.get('metadata', {}) if reusable else {}
+        # Hashes of the source stat and rendering context, checked before reading any source
+        self._previous_signatures: Dict[str, str] = previous.get('signatures', {}) if reusable else {}
+        self._current: Dict[str, str] = {}
+        self._metadata: Dict[str, Dict[str, Any]] = {}
+        self._signatures: Dict[str, str] = {}
+        # Outputs written with new content during this build
+        self._changed: Set[str] = set()
+        self.skipped = 0
+        self.rendered = 0
+
+    def _load(self) -> Dict[str, Any]:
+        """Load the manifest written by the previous build, if any."""
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+        return data
+
+    def is_up_to_date(self, rel_path: str, *inputs: Any) -> bool:
+        """
+        Record the inputs of an output and check whether it can be skipped.
+
+        Args:
+            rel_path: Output path relative to the output directory
+            inputs: Everything the output is rendered from
+
+        Returns:
+            True if the output exists and its inputs did not change
+        """
+        input_hash = hash_inputs(*inputs)
+        self._current[rel_path] = input_hash
+
+        if (self._previous.get(rel_path) == input_hash
+                and os.path.isfile(os.path.join(self.output_dir, rel_path))):
+            if rel_path in self._previous_metadata:
+                self._metadata[rel_path] = self._previous_metadata[rel_path]
+            self.skipped += 1
+            return True
+
+        self.rendered += 1
+        return False
+
+    def matches_signature(self, rel_path: str, signature: str) -> bool:
+        """
+        Record the source signature of an output and check whether it can be skipped unread.
+
+        A signature covers the source file's size and modification time along
+        with the rendering context, so matching it means the source does not
+        even need to be opened. Only outputs with recorded metadata qualify.
+
+        Args:
+            rel_path: Output path relative to the output directory
+            signature: Signature of the output's source and context
+
+        Returns:
+            True if the output exists and was kept from the previous build
+        """
+        self._signatures[rel_path] = signature
+        if (self._previous_signatures.get(rel_path) != signature
+                or rel_path not in self._previous_metadata
+                or not os.path.isfile(os.path.join(self.output_dir, rel_path))):
+            return False
+        return self.retain(rel_path)
+
+    def record(self, rel_path: str, *inputs: Any) -> None:
+        """Record an output produced this build without checking it."""
+        self._current[rel_path] = hash_inputs(*inputs)
+
+    def previous_matches(self, rel_path: str, *inputs: Any) -> bool:
+        """
+        Check whether the previous build recorded an output with the same inputs.
+
+        Unlike is_up_to_date, this holds on full builds too, and the output
+        is neither recorded nor counted as a skipped page.
+        """
+        return self._previous_outputs.get(rel_path) == hash_inputs(*inputs)
+
+    def keep_previous(self, rel_path: str) -> bool:
+        """
+        Keep the entry the previous build recorded for an output, on full builds too.
+
+        Returns:
+            True if the previous build recorded the output
+        """
+        if rel_path not in self._previous_outputs:
+            return False
+        self._current[rel_path] = self._previous_outputs[rel_path]
+        return True
+
+    def outputs(self) -> List[str]:
+        """List the outputs recorded so far in this build."""
+        return list(self._current)
+
+    def retain_all(self, exclude: Set[str]) -> None:
+        """Keep the previous entries of every output except the excluded ones."""
+        for rel_path in self._previous_outputs:
+            if rel_path not in exclude:
+                self._current[rel_path] = self._previous_outputs[rel_path]
+                if rel_path in self._previous_metadata:
+                    self._metadata[rel_path] = self._previous_metadata[rel_path]
+                if rel_path in self._previous_signatures:
+                    self._signatures[rel_path] = self._previous_signatures[rel_path]
+
+    def retain(self, rel_path: str) -> bool:
+        """
+        Keep the previous entry of an output that is known to be unchanged.
+
+        Returns:
+            True if the previous build recorded the output
+        """
+        if rel_path not in self._previous:
+            return False
+        self._current[rel_path] = self._previous[rel_path]
+        if rel_path in self._previous_metadata:
+            self._metadata[rel_path] = self._previous_metadata[rel_path]
+        self.skipped += 1
+        return True
+
+    def mark_changed(self, rel_path: str) -> None:
+        """Note that an output was written with new content during this build."""
+        self._changed.add(rel_path)
+
+    def is_changed(self, rel_path: str) -> bool:
+        """Check whether an output was written with new content during this build."""
+        return rel_path in self._changed
+
+    def get_metadata(self, rel_path: str) -> Optional[Dict[str, Any]]:
+        """Get the page metadata recorded for an output, if any."""
+        return self._metadata.get(rel_path)
+
+    def set_metadata(self, rel_path: str, metadata: Dict[str, Any]) -> None:
+        """Record page metadata (title, description, order) for an output."""
+        self._metadata[rel_path] = metadata
+
+    def _existing_files(self) -> Set[str]:
+        """List every file in the output dir."""
+        found = set()
+        for dirpath, _, filenames in os.walk(self.output_dir):
+            rel_dir = os.path.relpath(dirpath, self.output_dir)
+            for filename in filenames:
+                rel_path = filename if rel_dir == os.curdir else os.path.join(rel_dir, filename)
+                found.add(rel_path.replace(os.sep, '/'))
+        return found
+
+    def remove_stale_outputs(self, sweep: bool = False) -> List[str]:
+        """
+        Delete outputs produced by the previous build but not by this one.
+
+        Args:
+            sweep: Also delete every other file in the output dir that this
+                build didn't produce, as a clean build would
+
+        Returns:
+            List of removed output paths
+        """
+        removed = []
+        stale = set(self._previous_outputs)
+        if sweep:
+            stale |= self._existing_files()
+        for rel_path in sorted(stale - set(self._current)):
+            full_path = os.path.join(self.output_dir, rel_path)
+            if os.path.isfile(full_path):
+                os.remove(full_path)
+                removed.append(rel_path)
+            # Drop directories left empty by the removal
+            parent = os.path.dirname(full_path)
+            while parent and os.path.abspath(parent) != os.path.abspath(self.output_dir):
+                if not os.path.isdir(parent) or os.listdir(parent):
+                    break
+                os.rmdir(parent)
+                parent = os.path.dirname(parent)
+        return removed
+
+    def write_changes(self, base_url: str, removed: List[str], path: Optional[str] = None) -> Dict[str, List[str]]:
+        """
+        Write the URLs added, changed and deleted by this build.
+
+        Outputs rewritten with identical content don't count as changed.
+
+        Args:
+            base_url: Site base URL, prepended to every output path
+            removed: Output paths returned by remove_stale_outputs
+            path: File to write the list to (defaults to CHANGES_FILENAME
+                in the state dir)
+
+        Returns:
+            Sorted 'added', 'changed' and 'deleted' URLs
+        """
+        added = {rel_path for rel_path in self._current if rel_path not in self._previous_outputs}
+        changes = {
+            'added': sorted(added),
+            'changed': sorted(rel_path for rel_path in self._changed if rel_path in self._current
+                              and rel_path not in added),
+            'deleted': sorted(removed)
+        }
+        changes = {key: [base_url + rel_path for rel_path in paths] for key, paths in changes.items()}
+        path = path or self.changes_path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        write_output(path, json.dumps({'base_url': base_url, **changes}, indent=1))
+        return changes
+
+    def save(self) -> None:
+        """Write the manifest for the next build."""
+        os.makedirs(self.state_dir, exist_ok=True)
+        write_output(self.path, json.dumps({
+            'global_hash': self.global_hash,
+            'outputs': self._current,
+            'metadata': self._metadata,
+            'signatures': self._signatures
+        }, indent=1, sort_keys=True))
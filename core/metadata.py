@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Page front matter and collection post records for the static site generator.
+"""
+import datetime
+from typing import Dict, Any, Optional, Tuple
+import yaml
+
+
+FRONT_MATTER_DELIMITER = '---'
+
+
+def _parse_front_matter(text: str) -> Optional[Dict[str, Any]]:
+    """Parse a front matter block, or return None if it isn't a YAML mapping (e.g. text between '---' rules)."""
+    try:
+        data = yaml.safe_load(text)
+    except yaml.YAMLError:
+        return None
+    if data is None and not text.strip():
+        return {}
+    return data if isinstance(data, dict) else None
+
+
+def parse_date(value: Any) -> Optional[float]:
+    """
+    Convert a front matter date to a timestamp.
+
+    YAML loads unquoted dates ('2024-05-01', '2024-05-01 09:30:00') as date
+    and datetime objects; quoted ISO 8601 strings are accepted too. Dates
+    without a time zone are taken as UTC.
+
+    Args:
+        value: Front matter 'date' value
+
+    Returns:
+        POSIX timestamp, or None if there is no date
+
+    Raises:
+        ValueError: The value isn't a date
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value.strip())
+    elif isinstance(value, datetime.date) and not isinstance(value, datetime.datetime):
+        value = datetime.datetime(value.year, value.month, value.day)
+    if not isinstance(value, datetime.datetime):
+        raise ValueError(f"not a date: {value!r}")
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value.timestamp()
+
+
+def split_front_matter(md_content: str) -> Tuple[Dict[str, Any], str]:
+    """
+    Split optional YAML front matter from markdown content.
+
+    Front matter is a YAML mapping between two '---' lines at the very
+    start of the file. Anything else between them (such as a page opening
+    with a horizontal rule) is left in the content.
+
+    Args:
+        md_content: Markdown content
+
+    Returns:
+        Front matter values (empty if there is none) and the markdown body
+    """
+    lines = md_content.split('\n')
+    if lines[0].rstrip() != FRONT_MATTER_DELIMITER:
+        return {}, md_content
+    for i in range(1, len(lines)):
+        if lines[i].rstrip() == FRONT_MATTER_DELIMITER:
+            front = _parse_front_matter('\n'.join(lines[1:i]))
+            if front is None:
+                return {}, md_content
+            return front, '\n'.join(lines[i + 1:])
+    return {}, md_content
+
+
+class ListItem:
+    """
+    Compact record of a collection post, as listed on archive pages and feeds.
+
+    Collections keep one record per post until their list pages are written,
+    so records use slots instead of a per-instance dict.
+    """
+
+    __slots__ = ('title', 'url', 'description', 'order', 'source', 'date')
+
+    def __init__(self, title: str, url: str, description: str, order: float, source: str,
+                 date: Optional[float] = None):
+        self.title = title
+        self.url = url
+        self.description = description
+        self.order = order
+        self.source = source
+        # Front matter date as a timestamp, if any
+        self.date = date
+
+    @classmethod
+    def from_metadata(cls, url: str, metadata: Dict[str, Any], source: str) -> 'ListItem':
+        """Create the record of a post from its rendered (or previously recorded) metadata."""
+        return cls(metadata['title'], url, metadata['description'], metadata['order'], source,
+                   metadata.get('date'))
+
+    def key(self) -> Tuple[str, str, str]:
+        """Get the fields shown on list pages, for build input hashing."""
+        return self.title, self.url, self.description
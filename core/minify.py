@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+Minifiers for generated CSS, JavaScript and HTML.
+
+These are conservative, dependency-free minifiers tuned for the output of
+this generator: they remove comments and insignificant whitespace but never
+reorder or rename anything.
+"""
+import re
+
+
+# Elements whose content is kept byte for byte
+_PRESERVED_RE = re.compile(r'<(pre|textarea|script|style)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+_HTML_COMMENT_RE = re.compile(r'<!--(?!\[if).*?-->', re.DOTALL)
+_TAG_RE = re.compile(r'(<[^>]*>)')
+_TAG_NAME_RE = re.compile(r'<\s*/?\s*([a-zA-Z0-9!]+)')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Tags around which whitespace never renders
+_BLOCK_TAGS = {
+    '!doctype', 'html', 'head', 'body', 'title', 'meta', 'link', 'script', 'style',
+    'header', 'main', 'footer', 'nav', 'section', 'article', 'aside', 'div',
+    'ul', 'ol', 'li', 'dl', 'dt', 'dd', 'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'table', 'thead', 'tbody', 'tfoot', 'tr', 'td', 'th', 'hr', 'br', 'pre',
+    'blockquote', 'figure', 'figcaption', 'form', 'fieldset', 'iframe', 'video', 'picture', 'source',
+}
+
+_CSS_TOKEN_RE = re.compile(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|/\*.*?\*/)''', re.DOTALL)
+_CSS_PUNCTUATION_RE = re.compile(r'\s*([{};,>])\s*')
+_CSS_COLON_RE = re.compile(r':\s+')
+
+# Characters after which a slash starts a regular expression literal
+_JS_REGEX_PREFIX = set('(,=:[!&|?{};+-*%<>~^')
+
+
+def _is_block_tag(tag: str) -> bool:
+    """Check whether an HTML tag is block-level."""
+    match = _TAG_NAME_RE.match(tag)
+    return bool(match) and match.group(1).lower() in _BLOCK_TAGS
+
+
+def _minify_html_fragment(html: str, block_before: bool, block_after: bool) -> str:
+    """Minify HTML containing no preserved elements."""
+    tokens = _TAG_RE.split(_HTML_COMMENT_RE.sub('', html))
+    # tokens alternate text, tag, text, ..., text
+    for i in range(0, len(tokens), 2):
+        text = _WHITESPACE_RE.sub(' ', tokens[i])
+        prev_block = _is_block_tag(tokens[i - 1]) if i > 0 else block_before
+        next_block = _is_block_tag(tokens[i + 1]) if i + 1 < len(tokens) else block_after
+        if prev_block:
+            text = text.lstrip(' ')
+        if next_block:
+            text = text.rstrip(' ')
+        tokens[i] = text
+    return ''.join(tokens)
+
+
+def minify_html(html: str) -> str:
+    """
+    Minify HTML, keeping <pre>, <textarea>, <script> and <style> elements intact.
+
+    Args:
+        html: HTML document
+
+    Returns:
+        Minified HTML
+    """
+    parts = []
+    position = 0
+    block_before = True
+    for match in _PRESERVED_RE.finditer(html):
+        is_block = match.group(1).lower() != 'textarea'
+        parts.append(_minify_html_fragment(html[position:match.start()], block_before, is_block))
+        parts.append(match.group(0))
+        position = match.end()
+        block_before = is_block
+    parts.append(_minify_html_fragment(html[position:], block_before, True))
+    return ''.join(parts)
+
+
+def _minify_css_code(code: str) -> str:
+    """Minify CSS containing no strings or comments."""
+    code = _WHITESPACE_RE.sub(' ', code)
+    code = _CSS_PUNCTUATION_RE.sub(r'\1', code)
+    return _CSS_COLON_RE.sub(':', code)
+
+
+def minify_css(css: str) -> str:
+    """
+    Minify CSS by removing comments and insignificant whitespace.
+
+    Args:
+        css: Stylesheet source
+
+    Returns:
+        Minified stylesheet
+    """
+    # Drop comments first so the code around them is minified as one piece
+    tokens = [token for token in _CSS_TOKEN_RE.split(css) if not token.startswith('/*')]
+    parts = []
+    code = ''
+    for token in tokens:
+        if token.startswith(('"', "'")):
+            parts.append(_minify_css_code(code))
+            parts.append(token)
+            code = ''
+        else:
+            code += token
+    parts.append(_minify_css_code(code))
+    return ''.join(parts).replace(';}', '}').strip()
+
+
+def minify_js(js: str) -> str:
+    """
+    Minify JavaScript by removing comments, indentation and blank lines.
+
+    Line breaks are kept so automatic semicolon insertion is unaffected.
+
+    Args:
+        js: Script source
+
+    Returns:
+        Minified script
+    """
+    out = []
+    i = 0
+    length = len(js)
+    last_significant = ''
+    while i < length:
+        char = js[i]
+        if char in '\'"`':
+            # String or template literal
+            end = i + 1
+            while end < length and js[end] != char:
+                end += 2 if js[end] == '\\' else 1
+            out.append(js[i:end + 1])
+            last_significant = char
+            i = end + 1
+        elif js.startswith('//', i):
+            end = js.find('\n', i)
+            i = length if end == -1 else end
+        elif js.startswith('/*', i):
+            end = js.find('*/', i + 2)
+            i = length if end == -1 else end + 2
+        elif char == '/' and (last_significant in _JS_REGEX_PREFIX or not last_significant):
+            # Regular expression literal
+            end = i + 1
+            in_class = False
+            while end < length and (js[end] != '/' or in_class) and js[end] != '\n':
+                if js[end] == '\\':
+                    end += 1
+                elif js[end] == '[':
+                    in_class = True
+                elif js[end] == ']':
+                    in_class = False
+                end += 1
+            out.append(js[i:end + 1])
+            last_significant = '/'
+            i = end + 1
+        else:
+            out.append(char)
+            if not char.isspace():
+                last_significant = char
+            i += 1
+
+    lines = (line.strip() for line in ''.join(out).split('\n'))
+    return '\n'.join(line for line in lines if line)
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Build profiling: per-phase and per-page timings exported as a Chrome trace.
+"""
+import os
+import json
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Any, Iterator
+
+from .utils import write_output
+
+
+class BuildProfiler:
+    """Records build phases and page steps as Chrome trace events."""
+
+    PAGE_STEPS = ('read', 'convert', 'render', 'write')
+
+    def __init__(self):
+        self.events: List[Dict[str, Any]] = []
+
+    def _event(self, name: str, category: str, start_ns: int, end_ns: int, args: Dict[str, Any]) -> None:
+        """Record a complete ('X') trace event."""
+        self.events.append({
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': start_ns / 1000,
+            'dur': (end_ns - start_ns) / 1000,
+            'pid': os.getpid(),
+            'tid': 0,
+            'args': args
+        })
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a build phase, recording wall time and the CPU time of this process."""
+        start_ns = time.perf_counter_ns()
+        start_cpu_ns = time.process_time_ns()
+        try:
+            yield
+        finally:
+            cpu_ms = (time.process_time_ns() - start_cpu_ns) / 1e6
+            self._event(name, 'phase', start_ns, time.perf_counter_ns(), {'cpu_ms': round(cpu_ms, 3)})
+
+    @contextmanager
+    def step(self, name: str, url: str) -> Iterator[None]:
+        """Time one step (read, convert, render, write) of a page."""
+        start_ns = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self._event(name, 'page', start_ns, time.perf_counter_ns(), {'url': url})
+
+    def take_events(self) -> List[Dict[str, Any]]:
+        """Remove and return the recorded events, e.g. to send them from a worker process."""
+        events, self.events = self.events, []
+        return events
+
+    def merge(self, events: List[Dict[str, Any]]) -> None:
+        """Add events recorded by another profiler (typically in a worker process)."""
+        self.events.extend(events)
+
+    def page_times(self) -> Dict[str, Dict[str, float]]:
+        """
+        Sum the step durations of every page.
+
+        Returns:
+            Milliseconds spent in each step, by page URL
+        """
+        pages: Dict[str, Dict[str, float]] = {}
+        for event in self.events:
+            if event['cat'] == 'page':
+                steps = pages.setdefault(event['args']['url'], dict.fromkeys(self.PAGE_STEPS, 0.0))
+                steps[event['name']] += event['dur'] / 1000
+        return pages
+
+    def write_trace(self, path: str) -> None:
+        """Write the events as Chrome trace-event JSON (chrome://tracing, Perfetto)."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        write_output(path, json.dumps({'traceEvents': self.events, 'displayTimeUnit': 'ms'}))
+
+    def print_summary(self, top: int = 10) -> None:
+        """Print the phase timings and the slowest pages."""
+        print("Build profile:")
+        phases = [event for event in self.events if event['cat'] == 'phase']
+        # Nested phases end first; list them in start order
+        for event in sorted(phases, key=lambda event: event['ts']):
+            print(f"  {event['name']:<32} {event['dur'] / 1000:9.1f} ms wall "
+                  f"{event['args']['cpu_ms']:9.1f} ms cpu")
+
+        pages = self.page_times()
+        slowest = sorted(pages.items(), key=lambda item: sum(item[1].values()), reverse=True)[:top]
+        if slowest:
+            print(f"Slowest {len(slowest)} pages:")
+            for url, steps in slowest:
+                breakdown = ' '.join(f'{step} {steps[step]:.1f}' for step in self.PAGE_STEPS)
+                print(f"  {url:<40} {sum(steps.values()):9.1f} ms ({breakdown})")
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+Staged builds published with an atomic directory swap.
+"""
+import os
+import re
+import time
+import errno
+import ctypes
+import shutil
+from typing import Callable, Optional
+
+# renameat2() arguments, to exchange two directories in one step on Linux
+_AT_FDCWD = -100
+_RENAME_EXCHANGE = 2
+
+
+def _load_renameat2() -> Optional[Callable[..., int]]:
+    """Look up renameat2() in the C library, if it provides one."""
+    try:
+        renameat2 = ctypes.CDLL(None, use_errno=True).renameat2
+    except (AttributeError, OSError):
+        return None
+    renameat2.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p, ctypes.c_uint)
+    return renameat2
+
+
+_renameat2 = _load_renameat2()
+
+
+def exchange_paths(path_a: str, path_b: str) -> bool:
+    """
+    Atomically swap two existing paths with renameat2(RENAME_EXCHANGE).
+
+    Returns:
+        False if the platform or filesystem doesn't support exchanging paths
+    """
+    if _renameat2 is None:
+        return False
+    if _renameat2(_AT_FDCWD, os.fsencode(path_a), _AT_FDCWD, os.fsencode(path_b), _RENAME_EXCHANGE) == 0:
+        return True
+    error = ctypes.get_errno()
+    if error in (errno.ENOSYS, errno.EINVAL, errno.ENOTSUP, errno.EOPNOTSUPP):
+        return False
+    raise OSError(error, os.strerror(error), path_a, None, path_b)
+
+
+def link_tree(source_dir: str, dest_dir: str) -> int:
+    """
+    Recreate a directory tree with hard links to the source files.
+
+    Falls back to copying on filesystems without hard link support.
+
+    Args:
+        source_dir: Directory to mirror
+        dest_dir: Destination directory (created if missing)
+
+    Returns:
+        Number of linked or copied files
+    """
+    count = 0
+    for dirpath, dirnames, filenames in os.walk(source_dir):
+        target_dir = os.path.join(dest_dir, os.path.relpath(dirpath, source_dir))
+        os.makedirs(target_dir, exist_ok=True)
+        for filename in filenames:
+            source_path = os.path.join(dirpath, filename)
+            target_path = os.path.join(target_dir, filename)
+            if os.path.islink(source_path):
+                os.symlink(os.readlink(source_path), target_path)
+                continue
+            try:
+                os.link(source_path, target_path)
+            except OSError:
+                shutil.copy2(source_path, target_path)
+            count += 1
+    return count
+
+
+class StagedOutput:
+    """Builds into a sibling staging directory and swaps it in when complete."""
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir.rstrip('/\\') or output_dir
+        self.staging_dir = f'{self.output_dir}.staging'
+
+    def begin(self) -> str:
+        """
+        Prepare the staging directory from the live build.
+
+        Files of the live build are hard-linked, so unchanged outputs cost
+        no extra I/O. Writers must replace files rather than modify them.
+
+        Returns:
+            Directory the build should write into
+        """
+        if os.path.lexists(self.staging_dir):
+            shutil.rmtree(self.staging_dir)
+        if os.path.isdir(self.output_dir):
+            linked = link_tree(os.path.realpath(self.output_dir), self.staging_dir)
+            print(f"Staging build in {self.staging_dir} ({linked} files linked from the live build)")
+        else:
+            os.makedirs(self.staging_dir)
+        return self.staging_dir
+
+    def commit(self) -> None:
+        """
+        Publish the staged build in place of the live one.
+
+        A symlinked output is flipped with one atomic replace, and an output
+        directory is exchanged with the staged one in one step, so the
+        output path never goes missing. Where exchanging isn't supported,
+        the output directory is turned into a symlink once (the only moment
+        it is briefly missing), so every later build is published with a
+        flip.
+        """
+        if os.path.islink(self.output_dir):
+            self._flip_symlink()
+        elif not os.path.isdir(self.output_dir):
+            os.rename(self.staging_dir, self.output_dir)
+        elif exchange_paths(self.staging_dir, self.output_dir):
+            # The staging path now holds the previous build
+            shutil.rmtree(self.staging_dir, ignore_errors=True)
+        else:
+            self._convert_to_symlink()
+        print(f"Published build to {self.output_dir}")
+
+    def abort(self) -> None:
+        """Discard the staged build, leaving the live one untouched."""
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+
+    def _link_staged_build(self) -> str:
+        """
+        Move the staged build to a versioned directory and create a symlink to it.
+
+        Returns:
+            Path of the temporary symlink, to be renamed over the output path
+        """
+        # Timestamp plus nanoseconds, so two builds in the same second get distinct directories
+        now = time.time_ns()
+        stamp = time.strftime('%Y%m%d%H%M%S', time.localtime(now // 10**9))
+        target = f'{self.output_dir}.{stamp}.{now % 10**9:09d}'
+        os.rename(self.staging_dir, target)
+
+        tmp_link = f'{self.output_dir}.link-tmp'
+        if os.path.lexists(tmp_link):
+            os.remove(tmp_link)
+        os.symlink(os.path.basename(target), tmp_link)
+        return tmp_link
+
+    def _flip_symlink(self) -> None:
+        """Point the output symlink to the staged build with an atomic replace."""
+        previous = os.path.realpath(self.output_dir)
+        os.replace(self._link_staged_build(), self.output_dir)
+
+        # Only remove previous builds created by this flip
+        build_name = re.escape(os.path.basename(self.output_dir)) + r'\.\d{14}\.\d+'
+        if re.fullmatch(build_name, os.path.basename(previous)):
+            shutil.rmtree(previous, ignore_errors=True)
+
+    def _convert_to_symlink(self) -> None:
+        """
+        Replace the output directory by a symlink to the staged build.
+
+        A symlink can't replace a directory in one rename, so the output path
+        is briefly missing this one time; later builds flip the symlink.
+        """
+        tmp_link = self._link_staged_build()
+        old_dir = f'{self.output_dir}.old'
+        if os.path.lexists(old_dir):
+            shutil.rmtree(old_dir)
+        os.rename(self.output_dir, old_dir)
+        os.rename(tmp_link, self.output_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+        print(f"Converted {self.output_dir} to a symlink, so later builds are published atomically")
@@ -2,8 +2,21 @@
 """
 Utility functions for the static site generator.
 """
+import os
 import re
-from typing import Optional
+import json
+import shutil
+import filecmp
+import hashlib
+from typing import Any, Optional, TextIO
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+# Linux ioctl cloning a file's extents (reflink) on CoW filesystems
+_FICLONE = 0x40049409
 
 
 def slugify(value: str) -> str:
@@ -81,3 +94,167 @@ def remove_order_prefix(filename: str) -> str:
         Filename without the order prefix
     """
     return re.sub(r'^\d+-', '', filename)
+
+
+def hash_inputs(*inputs: Any) -> str:
+    """
+    Hash an arbitrary sequence of build inputs.
+    
+    Args:
+        inputs: Strings, bytes or JSON-serializable values
+        
+    Returns:
+        Hex digest identifying the inputs
+    """
+    digest = hashlib.sha256()
+    for item in inputs:
+        if isinstance(item, bytes):
+            data = item
+        elif isinstance(item, str):
+            data = item.encode('utf-8')
+        else:
+            data = json.dumps(item, sort_keys=True, default=str).encode('utf-8')
+        digest.update(len(data).to_bytes(8, 'little'))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def _unlink_existing(path: str) -> None:
+    """Remove a file if it exists."""
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def write_output(path: str, content: str) -> None:
+    """
+    Write a generated text file, replacing any existing file.
+    
+    Outputs may be hard links shared with a previous build, so an existing
+    file is unlinked instead of being truncated in place.
+    
+    Args:
+        path: Output file path
+        content: Text content to write
+    """
+    with open_output(path) as f:
+        f.write(content)
+
+
+def write_if_changed(path: str, content: str) -> bool:
+    """
+    Write a generated text file unless it already has this content.
+    
+    Unchanged files keep their modification time, so sync and upload tools
+    only transfer what a build actually changed.
+    
+    Args:
+        path: Output file path
+        content: Text content to write
+        
+    Returns:
+        True if the file was written
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    except (FileNotFoundError, UnicodeDecodeError):
+        pass
+    write_output(path, content)
+    return True
+
+
+def open_output(path: str) -> TextIO:
+    """
+    Open a generated text file for streaming writes, replacing any existing file.
+    
+    Args:
+        path: Output file path
+        
+    Returns:
+        File object opened for writing
+    """
+    _unlink_existing(path)
+    return open(path, 'w', encoding='utf-8')
+
+
+def _clone_file(source_path: str, dest_path: str) -> None:
+    """Copy file data with a reflink or in-kernel copy where supported."""
+    with open(source_path, 'rb') as src, open(dest_path, 'wb') as dst:
+        if fcntl is not None:
+            try:
+                fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+                return
+            except OSError:
+                pass
+        if hasattr(os, 'copy_file_range'):
+            try:
+                remaining = os.fstat(src.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                if remaining == 0:
+                    return
+            except OSError:
+                pass
+            src.seek(0)
+            dst.seek(0)
+            dst.truncate()
+        shutil.copyfileobj(src, dst)
+
+
+def copy_output(source_path: str, dest_path: str, link: bool = False) -> str:
+    """
+    Copy a file into the output, replacing any existing file (see write_output).
+    
+    Uses reflinks or copy_file_range where the filesystem supports them, and
+    hard links when requested, falling back to a regular copy.
+    
+    Args:
+        source_path: File to copy
+        dest_path: Destination path
+        link: Hard-link the source instead of copying it
+        
+    Returns:
+        Destination path
+    """
+    _unlink_existing(dest_path)
+    if link:
+        try:
+            os.link(source_path, dest_path)
+            return dest_path
+        except OSError:
+            pass
+    _clone_file(source_path, dest_path)
+    shutil.copystat(source_path, dest_path)
+    return dest_path
+
+
+def files_identical(path_a: str, path_b: str) -> bool:
+    """
+    Check whether two files have the same content.
+    
+    Size and modification time are compared first, file contents only when
+    the sizes match but the times differ.
+    
+    Args:
+        path_a: First file
+        path_b: Second file
+        
+    Returns:
+        True if both files exist with identical content
+    """
+    try:
+        stat_a = os.stat(path_a)
+        stat_b = os.stat(path_b)
+    except FileNotFoundError:
+        return False
+    if stat_a.st_size != stat_b.st_size:
+        return False
+    if stat_a.st_mtime_ns == stat_b.st_mtime_ns or os.path.samestat(stat_a, stat_b):
+        return True
+    return filecmp.cmp(path_a, path_b, shallow=False)
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Background output writer for the static site generator.
+"""
+import os
+import queue
+import threading
+from typing import List, Optional, Set, Tuple
+
+from core.utils import write_if_changed
+
+
+class OutputWriter:
+    """
+    Writes generated files from a small pool of threads.
+
+    Writes are queued in batches so rendering and disk I/O overlap. The
+    queue is bounded: when the threads fall behind, write() blocks until a
+    batch is done, which keeps the rendered pages held in memory bounded.
+    Files that already have the content are left untouched, and the paths
+    actually written are collected for take_changed(). Errors are collected
+    and raised by flush().
+    """
+
+    def __init__(self, threads: int = 2, batch_size: int = 16, max_batches: int = 8):
+        self.threads = threads
+        self.batch_size = batch_size
+        self._queue: 'queue.Queue[Optional[List[Tuple[str, str]]]]' = queue.Queue(maxsize=max_batches)
+        self._batch: List[Tuple[str, str]] = []
+        self._workers: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._created_dirs: Set[str] = set()
+        self._errors: List[Tuple[str, Exception]] = []
+        self._changed: List[str] = []
+
+    def _start(self) -> None:
+        """Start the writer threads on first use."""
+        for _ in range(self.threads):
+            worker = threading.Thread(target=self._run, daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def _run(self) -> None:
+        """Write queued batches until the stop marker is received."""
+        while True:
+            batch = self._queue.get()
+            try:
+                if batch is None:
+                    return
+                for path, content in batch:
+                    try:
+                        self._ensure_dir(os.path.dirname(path))
+                        if write_if_changed(path, content):
+                            with self._lock:
+                                self._changed.append(path)
+                    except Exception as e:
+                        # Any error is kept for flush(); a dead thread would leave its batches queued forever
+                        with self._lock:
+                            self._errors.append((path, e))
+            finally:
+                self._queue.task_done()
+
+    def _ensure_dir(self, directory: str) -> None:
+        """Create an output directory, once per writer."""
+        if not directory or directory in self._created_dirs:
+            return
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            self._created_dirs.add(directory)
+
+    def write(self, path: str, content: str) -> None:
+        """
+        Queue a text file to be written, replacing any existing file.
+
+        Args:
+            path: Output file path; missing parent directories are created
+            content: Text content to write
+        """
+        self._batch.append((path, content))
+        if len(self._batch) >= self.batch_size:
+            self._submit()
+
+    def _submit(self) -> None:
+        """Hand the current batch to the writer threads, waiting if the queue is full."""
+        if not self._batch:
+            return
+        if not self._workers:
+            self._start()
+        self._queue.put(self._batch)
+        self._batch = []
+
+    def take_changed(self) -> List[str]:
+        """
+        Get the files written with new content since the last call.
+
+        Only covers writes that have completed; call flush() first.
+        """
+        with self._lock:
+            changed, self._changed = self._changed, []
+        return changed
+
+    def flush(self) -> None:
+        """
+        Wait until every queued file is written.
+
+        Raises:
+            Exception: The first write error since the last flush, usually an
+                OSError (every failed path is reported)
+        """
+        self._submit()
+        self._queue.join()
+        with self._lock:
+            errors, self._errors = self._errors, []
+        for path, error in errors:
+            print(f"Error writing '{path}': {error}")
+        if errors:
+            raise errors[0][1]
+
+    def close(self) -> None:
+        """Flush pending writes and stop the writer threads."""
+        try:
+            self.flush()
+        finally:
+            for _ in self._workers:
+                self._queue.put(None)
+            for worker in self._workers:
+                worker.join()
+            self._workers = []
@@ -5,7 +5,10 @@ Autosite: Static site generator main entry point.
 This module provides the command-line interface for the static site generator.
 """
 
+import os
+
 from site_generator import generate_site
+from site_watcher import watch_site
 
 
 if __name__ == '__main__':
@@ -14,5 +17,34 @@ if __name__ == '__main__':
     parser.add_argument('--config', default='config.yaml', help='Path to config file')
     parser.add_argument('--output', default='site', help='Output directory')
     parser.add_argument('--paginate-by', type=int, default=10, help='Items per list page')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only re-render pages whose inputs changed since the last build')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Number of worker processes used to render pages (0 = all CPU cores)')
+    parser.add_argument('--clear-cache', action='store_true',
+                        help='Remove the persistent build cache before generating')
+    parser.add_argument('--atomic', action='store_true',
+                        help='Build into a staging directory and swap it in only when complete')
+    parser.add_argument('--minify', action='store_true',
+                        help='Minify generated CSS, JavaScript and HTML')
+    parser.add_argument('--precompress', action='store_true',
+                        help='Write .gz and .br copies of the text outputs for servers that serve them as is')
+    parser.add_argument('--changes-file', metavar='PATH',
+                        help='Write the URLs added, changed and deleted by the build to this JSON file '
+                             '(default: changes.json in the build state dir under the cache dir)')
+    parser.add_argument('--profile', nargs='?', const='build-profile.json', metavar='TRACE',
+                        help='Record build timings and write them as a Chrome trace (default: build-profile.json)')
+    parser.add_argument('--profile-top', type=int, default=10,
+                        help='Number of slowest pages listed in the profile summary')
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep running and rebuild the affected pages whenever a source changes')
     args = parser.parse_args()
-    generate_site(args.config, args.output, args.paginate_by)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    if args.watch:
+        watch_site(args.config, args.output, args.paginate_by, jobs=jobs, clear_cache=args.clear_cache,
+                   minify=args.minify, precompress=args.precompress, changes_file=args.changes_file)
+    else:
+        generate_site(args.config, args.output, args.paginate_by, incremental=args.incremental, jobs=jobs,
+                      clear_cache=args.clear_cache, atomic=args.atomic, minify=args.minify,
+                      profile=args.profile, profile_top=args.profile_top, precompress=args.precompress,
+                      changes_file=args.changes_file)
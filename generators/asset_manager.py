@@ -3,70 +3,269 @@
 Asset management for the static site generator.
 """
 import os
+import json
 import shutil
-from typing import Dict, Any
+import hashlib
+from typing import Dict, Any, List, Optional, Callable
+from urllib.parse import urlparse
 from jinja2 import Template
 
 from templates import TEMPLATES
+from core.utils import write_if_changed, copy_output, files_identical
+from core.manifest import BuildManifest
+from core.minify import minify_css, minify_js
+from core.highlight import highlight_stylesheet
+from core.fonts import FontSubsetter
+from core.images import ImageInfo, ImageProcessor
 
 
 class AssetManager:
     """Manages static assets and CSS generation."""
     
-    def __init__(self, output_dir: str, source_assets_dir: str = 'assets'):
+    # Assets linked from the templates, written under content-hashed names when fingerprinting
+    FINGERPRINTED_ASSETS = ('custom-font.css', 'style.css', 'script.js', 'highlight.css')
+    FINGERPRINT_LENGTH = 10
+    
+    # Cache-Control values written to the _headers file
+    IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+    HTML_CACHE_CONTROL = 'public, max-age=300, must-revalidate'
+    
+    def __init__(self, output_dir: str, source_assets_dir: str = 'assets', hardlink: bool = False,
+                 manifest: Optional[BuildManifest] = None, minify: bool = False,
+                 font_subsetter: Optional[FontSubsetter] = None):
         self.output_dir = output_dir
         self.source_assets_dir = source_assets_dir
         self.assets_output_dir = os.path.join(output_dir, 'assets')
+        self.hardlink = hardlink
+        self.manifest = manifest
+        self.minify = minify
+        self.font_subsetter = font_subsetter
+        self.bytes_saved = 0
     
-    def setup_output_directory(self) -> None:
-        """Create and prepare the output directory."""
-        if os.path.exists(self.output_dir):
+    def setup_output_directory(self, clean: bool = True) -> None:
+        """
+        Create and prepare the output directory.
+        
+        Args:
+            clean: Remove any previous build output first
+        """
+        if clean and os.path.exists(self.output_dir):
             shutil.rmtree(self.output_dir)
         os.makedirs(self.assets_output_dir, exist_ok=True)
     
-    def copy_custom_assets(self) -> None:
-        """Copy custom assets from source assets folder."""
+    def copy_custom_assets(self) -> List[str]:
+        """
+        Sync custom assets from the source assets folder.
+        
+        Files identical to the ones already in the output are skipped, and
+        directories are synced file by file.
+        
+        Returns:
+            Output paths (relative to the output directory) of every custom asset
+        """
         if not os.path.exists(self.source_assets_dir):
             print(f"Cartella assets '{self.source_assets_dir}' non trovata")
-            return
+            return []
         
-        print(f"Copiando assets da: {self.source_assets_dir}")
-        for item in os.listdir(self.source_assets_dir):
-            source_path = os.path.join(self.source_assets_dir, item)
-            dest_path = os.path.join(self.assets_output_dir, item)
+        print(f"Sincronizzando assets da: {self.source_assets_dir}")
+        synced = []
+        skipped = 0
+        for dirpath, dirnames, filenames in os.walk(self.source_assets_dir):
+            dirnames.sort()
+            rel_dir = os.path.relpath(dirpath, self.source_assets_dir)
+            dest_dir = os.path.normpath(os.path.join(self.assets_output_dir, rel_dir))
+            os.makedirs(dest_dir, exist_ok=True)
             
-            if os.path.isfile(source_path):
-                shutil.copy2(source_path, dest_path)
-                if item.endswith(('.ttf', '.otf', '.woff', '.woff2')):
-                    print(f"Copiato font: {item}")
+            for filename in sorted(filenames):
+                source_path = os.path.join(dirpath, filename)
+                dest_path = os.path.join(dest_dir, filename)
+                rel_path = os.path.relpath(dest_path, self.output_dir).replace(os.sep, '/')
+                synced.append(rel_path)
+                
+                if self.font_subsetter is not None and filename.endswith('.css'):
+                    # Stylesheets pointing to subsetted fonts are rewritten instead of copied
+                    with open(source_path, encoding='utf-8') as f:
+                        css = f.read()
+                    rewritten = self.font_subsetter.rewrite_css(css, rel_dir)
+                    if rewritten != css:
+                        self._write_asset(rel_path, rewritten)
+                        continue
+                
+                if self.manifest is not None:
+                    stat = os.stat(source_path)
+                    self.manifest.record(rel_path, stat.st_size, stat.st_mtime_ns)
+                
+                if files_identical(source_path, dest_path):
+                    skipped += 1
+                    continue
+                
+                copy_output(source_path, dest_path, link=self.hardlink)
+                self._mark_changed(rel_path)
+                if filename.endswith(('.ttf', '.otf', '.woff', '.woff2')):
+                    print(f"Copiato font: {rel_path}")
                 else:
-                    print(f"Copiato asset: {item}")
-            elif os.path.isdir(source_path):
-                shutil.copytree(source_path, dest_path)
-                print(f"Copiata cartella asset: {item}")
+                    print(f"Copiato asset: {rel_path}")
+        
+        if skipped:
+            print(f"Saltati {skipped} asset invariati")
+        return synced
     
-    def generate_css(self, theme: Dict[str, str]) -> None:
-        """Generate CSS file with theme variables."""
+    def _mark_changed(self, rel_path: str) -> None:
+        """Report an asset written with new content to the manifest."""
+        if self.manifest is not None:
+            self.manifest.mark_changed(rel_path)
+    
+    def _write_asset(self, rel_path: str, content: str, *inputs: Any) -> None:
+        """
+        Write a generated file unless it already has this content, and record it.
+        
+        Args:
+            rel_path: Output path relative to the output directory
+            content: Text content to write
+            inputs: Inputs recorded in the manifest (defaults to the content)
+        """
+        if write_if_changed(os.path.join(self.output_dir, rel_path), content):
+            self._mark_changed(rel_path)
+        if self.manifest is not None:
+            self.manifest.record(rel_path, *(inputs or (content,)))
+    
+    def _minified(self, content: str, minifier: Callable[[str], str]) -> str:
+        """Minify generated content if enabled, tracking the bytes saved."""
+        if not self.minify:
+            return content
+        minified = minifier(content)
+        self.bytes_saved += len(content.encode('utf-8')) - len(minified.encode('utf-8'))
+        return minified
+    
+    def generate_css(self, theme: Dict[str, str], search: bool = False) -> None:
+        """Generate CSS file with theme variables (and the search box styles if search is enabled)."""
         css_template = Template(TEMPLATES['assets/style.css'])
         css_content = css_template.render(
             font_family=theme['font_family'],
             primary_color=theme['primary_color'],
-            contrast_color=theme['contrast_color']
+            contrast_color=theme['contrast_color'],
+            search=search
         )
         
-        css_path = os.path.join(self.assets_output_dir, 'style.css')
-        with open(css_path, 'w', encoding='utf-8') as f:
-            f.write(css_content)
-    
-    def generate_js(self) -> None:
-        """Generate JavaScript file."""
-        js_path = os.path.join(self.assets_output_dir, 'script.js')
-        with open(js_path, 'w', encoding='utf-8') as f:
-            f.write(TEMPLATES['assets/script.js'])
-    
-    def generate_all_assets(self, theme: Dict[str, str]) -> None:
-        """Generate all assets (CSS, JS) and copy custom assets."""
-        self.setup_output_directory()
-        self.copy_custom_assets()
-        self.generate_css(theme)
-        self.generate_js()
+        self._write_asset('assets/style.css', self._minified(css_content, minify_css))
+    
+    def generate_js(self, search: bool = False) -> None:
+        """Generate JavaScript file (with the search client if search is enabled)."""
+        js_content = Template(TEMPLATES['assets/script.js'], keep_trailing_newline=True).render(search=search)
+        self._write_asset('assets/script.js', self._minified(js_content, minify_js))
+    
+    def generate_highlight_css(self, style: str) -> None:
+        """Generate the stylesheet of code blocks highlighted at build time."""
+        self._write_asset('assets/highlight.css', self._minified(highlight_stylesheet(style), minify_css))
+    
+    def generate_all_assets(self, theme: Dict[str, str], clean: bool = True,
+                            highlight_style: Optional[str] = None, search: bool = False) -> List[str]:
+        """
+        Generate all assets (CSS, JS) and sync custom assets.
+        
+        Args:
+            theme: Theme colors and font
+            clean: Remove any previous build output first
+            highlight_style: Pygments style of build-time highlighting, if enabled
+            search: Include the client-side search styles and script
+        
+        Returns:
+            Output paths of the custom assets
+        """
+        self.setup_output_directory(clean)
+        synced = self.copy_custom_assets()
+        self.generate_css(theme, search)
+        self.generate_js(search)
+        if highlight_style:
+            self.generate_highlight_css(highlight_style)
+        return synced
+    
+    def write_font_subsets(self) -> None:
+        """Write the WOFF2 subsets of the custom fonts, once every page has been rendered."""
+        for name, cached_path in self.font_subsetter.subset_fonts().items():
+            rel_path = f'assets/{name}'
+            dest_path = os.path.join(self.assets_output_dir, name)
+            if not files_identical(cached_path, dest_path):
+                copy_output(cached_path, dest_path)
+                self._mark_changed(rel_path)
+                print(f"Creato subset font: {rel_path}")
+            if self.manifest is not None:
+                self.manifest.record(rel_path, os.path.basename(cached_path))
+    
+    def write_image_variants(self, processor: ImageProcessor) -> Dict[str, ImageInfo]:
+        """
+        Write the resized variants of the custom asset images.
+        
+        Args:
+            processor: Image processor creating (or reusing) the variants
+        
+        Returns:
+            Dimensions and variant widths of each image, by output path
+        """
+        images, variants = processor.process()
+        created = 0
+        for rel_path, cached_path in sorted(variants.items()):
+            dest_path = os.path.join(self.output_dir, rel_path)
+            if not files_identical(cached_path, dest_path):
+                copy_output(cached_path, dest_path)
+                self._mark_changed(rel_path)
+                created += 1
+            if self.manifest is not None:
+                self.manifest.record(rel_path, os.path.basename(cached_path))
+        if created:
+            print(f"Varianti di immagini create: {created}")
+        return images
+    
+    def fingerprint_assets(self) -> Dict[str, str]:
+        """
+        Write content-hashed copies of the assets linked from the templates.
+        
+        The mapping is also saved as assets/manifest.json.
+        
+        Returns:
+            Mapping of asset name to fingerprinted name
+        """
+        asset_map = {}
+        for name in self.FINGERPRINTED_ASSETS:
+            path = os.path.join(self.assets_output_dir, name)
+            if not os.path.isfile(path):
+                continue
+            
+            with open(path, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()[:self.FINGERPRINT_LENGTH]
+            root, ext = os.path.splitext(name)
+            hashed_name = f'{root}.{digest}{ext}'
+            hashed_path = os.path.join(self.assets_output_dir, hashed_name)
+            
+            if not files_identical(path, hashed_path):
+                copy_output(path, hashed_path)
+                self._mark_changed(f'assets/{hashed_name}')
+            if self.manifest is not None:
+                self.manifest.record(f'assets/{hashed_name}', digest)
+            asset_map[name] = hashed_name
+        
+        self._write_asset('assets/manifest.json', json.dumps(asset_map, indent=2, sort_keys=True), asset_map)
+        return asset_map
+    
+    def write_headers(self, asset_map: Dict[str, str], base_url: str) -> None:
+        """
+        Write a _headers file with cache lifetimes for the CDN.
+        
+        Fingerprinted assets never change and are cached forever, HTML pages
+        only briefly.
+        
+        Args:
+            asset_map: Mapping returned by fingerprint_assets
+            base_url: Site base URL
+        """
+        prefix = urlparse(base_url).path or '/'
+        if not prefix.endswith('/'):
+            prefix += '/'
+        
+        lines = []
+        for hashed_name in sorted(asset_map.values()):
+            lines += [f'{prefix}assets/{hashed_name}', f'  Cache-Control: {self.IMMUTABLE_CACHE_CONTROL}']
+        for pattern in (prefix, f'{prefix}*.html'):
+            lines += [pattern, f'  Cache-Control: {self.HTML_CACHE_CONTROL}']
+        
+        self._write_asset('_headers', '\n'.join(lines) + '\n', lines)
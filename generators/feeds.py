@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Atom and RSS feeds for collections.
+"""
+import io
+import os
+import time
+from email.utils import formatdate
+from typing import Iterable, List, Optional, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+from core.utils import write_if_changed
+from core.manifest import BuildManifest
+from core.metadata import ListItem
+
+
+# (url, title, description, publication timestamp) of a feed entry
+FeedEntry = Tuple[str, str, str, float]
+
+
+class FeedWriter:
+    """Writes a feed of the newest posts of each collection, linking them by absolute URL."""
+
+    FORMATS = ('atom', 'rss')
+
+    def __init__(self, output_dir: str, site_url: str, site_title: str, feed_format: str = 'atom',
+                 limit: int = 20, manifest: Optional[BuildManifest] = None):
+        if feed_format not in self.FORMATS:
+            raise ValueError(f"Invalid feed format '{feed_format}': must be one of {', '.join(self.FORMATS)}")
+        self.output_dir = output_dir
+        self.site_url = site_url
+        self.site_title = site_title
+        self.feed_format = feed_format
+        self.limit = limit
+        self.manifest = manifest
+
+    def write_collection(self, slug: str, title: str, items: Iterable[ListItem]) -> str:
+        """
+        Write the feed of a collection.
+
+        Only the first `limit` items are read from the stream.
+
+        Args:
+            slug: Collection slug (the feed is written as <slug>/feed.xml)
+            title: Collection title
+            items: Records of the collection posts, newest first
+
+        Returns:
+            Output path of the feed
+        """
+        # Posts without a front matter date fall back to the modification time of their source
+        newest: List[FeedEntry] = []
+        for item in items:
+            if len(newest) == self.limit:
+                break
+            published = item.date if item.date is not None else os.stat(item.source).st_mtime
+            newest.append((item.url, item.title, item.description, published))
+
+        rel_path = f'{slug}/feed.xml'
+        f = io.StringIO()
+        if self.feed_format == 'atom':
+            self._write_atom(f, slug, title, rel_path, newest)
+        else:
+            self._write_rss(f, slug, title, newest)
+
+        # List pages of the collection may still be queued for writing
+        os.makedirs(os.path.join(self.output_dir, slug), exist_ok=True)
+        if write_if_changed(os.path.join(self.output_dir, rel_path), f.getvalue()) and self.manifest is not None:
+            self.manifest.mark_changed(rel_path)
+
+        if self.manifest is not None:
+            self.manifest.record(rel_path, self.feed_format, newest)
+        return rel_path
+
+    def _write_atom(self, f, slug: str, title: str, rel_path: str, entries: List[FeedEntry]) -> None:
+        """Write an Atom 1.0 feed."""
+        collection_url = f'{self.site_url}{slug}/index.html'
+        updated = max((published for _, _, _, published in entries), default=0)
+        f.write('<?xml version="1.0" encoding="utf-8"?>\n<feed xmlns="http://www.w3.org/2005/Atom">\n')
+        f.write(f'  <title>{escape(f"{title} - {self.site_title}")}</title>\n')
+        f.write(f'  <link href={quoteattr(collection_url)}/>\n')
+        f.write(f'  <link rel="self" href={quoteattr(self.site_url + rel_path)}/>\n')
+        f.write(f'  <id>{escape(collection_url)}</id>\n')
+        f.write(f'  <updated>{_iso_date(updated)}</updated>\n')
+        for page_url, entry_title, description, published in entries:
+            url = self.site_url + page_url
+            f.write('  <entry>\n')
+            f.write(f'    <title>{escape(str(entry_title))}</title>\n')
+            f.write(f'    <link href={quoteattr(url)}/>\n')
+            f.write(f'    <id>{escape(url)}</id>\n')
+            f.write(f'    <updated>{_iso_date(published)}</updated>\n')
+            if description:
+                f.write(f'    <summary>{escape(str(description))}</summary>\n')
+            f.write('  </entry>\n')
+        f.write('</feed>\n')
+
+    def _write_rss(self, f, slug: str, title: str, entries: List[FeedEntry]) -> None:
+        """Write an RSS 2.0 feed."""
+        f.write('<?xml version="1.0" encoding="utf-8"?>\n<rss version="2.0">\n<channel>\n')
+        f.write(f'  <title>{escape(f"{title} - {self.site_title}")}</title>\n')
+        f.write(f'  <link>{escape(f"{self.site_url}{slug}/index.html")}</link>\n')
+        f.write(f'  <description>{escape(f"{title} archive")}</description>\n')
+        for page_url, entry_title, description, published in entries:
+            url = self.site_url + page_url
+            f.write('  <item>\n')
+            f.write(f'    <title>{escape(str(entry_title))}</title>\n')
+            f.write(f'    <link>{escape(url)}</link>\n')
+            f.write(f'    <guid>{escape(url)}</guid>\n')
+            if description:
+                f.write(f'    <description>{escape(str(description))}</description>\n')
+            f.write(f'    <pubDate>{formatdate(published, usegmt=True)}</pubDate>\n')
+            f.write('  </item>\n')
+        f.write('</channel>\n</rss>\n')
+
+
+def _iso_date(timestamp: float) -> str:
+    """Format a timestamp as an RFC 3339 UTC date."""
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(timestamp))
@@ -3,9 +3,12 @@
 Navigation builder for the static site generator.
 """
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from jinja2 import Template
+from markupsafe import Markup
 
 from core.utils import slugify
+from core.content import ContentIndex
 
 
 class NavigationBuilder:
@@ -14,14 +17,18 @@ class NavigationBuilder:
     def __init__(self, pages_config: List[Dict[str, Any]]):
         self.pages_config = pages_config
     
-    def build_navigation(self) -> List[Dict[str, str]]:
+    def build_navigation(self, content: Optional[ContentIndex] = None) -> List[Dict[str, str]]:
         """
         Build navigation structure from pages configuration.
         
+        Args:
+            content: Content index of the build, to avoid stat'ing page paths again
+            
         Returns:
             List of navigation items with title and url
         """
         nav = [{'title': 'Home', 'url': 'index.html'}]
+        is_file = content.is_file if content is not None else os.path.isfile
         
         for page in self.pages_config:
             title = page.get('title') or os.path.splitext(os.path.basename(page['path']))[0].title()
@@ -32,9 +39,29 @@ class NavigationBuilder:
                 nav.append({'title': title, 'url': path, 'external': True})
             else:
                 slug = slugify(title)
-                if os.path.isfile(path):
+                if is_file(path):
                     nav.append({'title': title, 'url': f'{slug}.html'})
                 else:
                     nav.append({'title': title, 'url': f'{slug}/index.html'})
         
         return nav
+    
+    @staticmethod
+    def render_fragments(nav: List[Dict[str, str]], template: Template, base_url: str) -> Dict[str, Markup]:
+        """
+        Pre-render the navigation menu once per distinct active entry.
+        
+        Args:
+            nav: Navigation items returned by build_navigation
+            template: Navigation menu template
+            base_url: Site base URL
+            
+        Returns:
+            Menu HTML by active URL; the '' key holds the menu with no active entry
+        """
+        fragments = {'': Markup(template.render(nav=nav, current_url=None, base_url=base_url))}
+        for item in nav:
+            if not item.get('external') and item['url'] not in fragments:
+                rendered = template.render(nav=nav, current_url=item['url'], base_url=base_url)
+                fragments[item['url']] = Markup(rendered)
+        return fragments
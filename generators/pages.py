@@ -3,73 +3,376 @@
 Page generation for the static site generator.
 """
 import os
-import glob
-from typing import List, Dict, Any
-import markdown
-from jinja2 import Environment, DictLoader, select_autoescape
+import html
+import itertools
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Iterable, Optional, Set, Tuple
+from jinja2 import (Environment, DictLoader, FileSystemLoader, ChoiceLoader, FileSystemBytecodeCache,
+                    Template, meta, select_autoescape)
 
 from templates import TEMPLATES
-from core.utils import slugify, extract_first_h1, extract_first_h2, extract_order_number, remove_order_prefix
+from core.utils import slugify, extract_order_number, remove_order_prefix, hash_inputs
+from core.manifest import BuildManifest
+from core.converter import MarkdownConverter, METADATA_VERSION
+from core.cache import ConversionCache
+from core.content import ContentIndex
+from core.writer import OutputWriter
+from core.dependencies import DependencyGraph
+from core.minify import minify_html
+from core.metadata import ListItem, parse_date, split_front_matter
+from core.profiler import BuildProfiler
+from generators.navigation import NavigationBuilder
+from generators.sitemap import SitemapWriter
+from generators.feeds import FeedWriter
+from generators.search import SearchIndexBuilder, extract_terms
+
+
+# Per-process generator used by pool workers, created once by _init_worker
+_worker_generator = None
+
+
+def _init_worker(options: Dict[str, Any]) -> None:
+    """Set up the page generator (Jinja environment and markdown converter) once per worker process."""
+    global _worker_generator
+    _worker_generator = PageGenerator(**options)
+
+
+def _render_page_batch(tasks: List[Tuple[str, str, str, Optional[str]]]
+                       ) -> Tuple[List[Tuple[Dict[str, Any], Optional[List[str]]]], int, List[Dict[str, Any]],
+                                  List[str], str]:
+    """
+    Render a batch of markdown pages inside a worker process.
+    
+    Returns:
+        Metadata and search terms of each page, the bytes saved by
+        minification, the profiler events recorded (if profiling), the
+        files written with new content and the characters of the pages (if
+        collecting glyphs)
+    """
+    _worker_generator.bytes_saved = 0
+    if _worker_generator.glyphs is not None:
+        _worker_generator.glyphs.clear()
+    results = [_worker_generator._render_markdown_page(*task) for task in tasks]
+    # The pages must be on disk when the batch is reported as done
+    _worker_generator.writer.flush()
+    profiler = _worker_generator.profiler
+    return (results, _worker_generator.bytes_saved, profiler.take_events() if profiler else [],
+            _worker_generator.writer.take_changed(), ''.join(_worker_generator.glyphs or ()))
+
+
+def _post_order(order: Any, source: str) -> float:
+    """Get the sort order of a collection post: its front matter order, or else its filename number."""
+    if order is None:
+        return extract_order_number(source)
+    if not isinstance(order, (int, float)) or isinstance(order, bool):
+        raise ValueError(f"Invalid front matter order in '{source}': must be a number")
+    return order
 
 
 class PageGenerator:
     """Generates HTML pages from markdown content."""
     
-    def __init__(self, output_dir: str, site_title: str, base_url: str, nav: List[Dict[str, str]]):
+    # Number of batches handed to each worker per collection, to balance load
+    BATCHES_PER_JOB = 4
+    
+    # Maximum number of collection posts read into memory before they are rendered
+    RENDER_WINDOW = 1000
+    
+    # Threads writing rendered pages to disk while the next ones are rendered
+    WRITER_THREADS = 2
+    
+    # Templates that can be overridden from the user templates directory
+    PAGE_TEMPLATES = ('base.html', 'page.html', 'list.html', 'nav.html')
+    
+    def __init__(self, output_dir: str, site_title: str, base_url: str, nav: List[Dict[str, str]],
+                 manifest: Optional[BuildManifest] = None, jobs: int = 1,
+                 markdown_config: Optional[Dict[str, Any]] = None, cache: Optional[ConversionCache] = None,
+                 graph: Optional[DependencyGraph] = None, asset_map: Optional[Dict[str, str]] = None,
+                 minify: bool = False, templates_dir: Optional[str] = None,
+                 bytecode_cache_dir: Optional[str] = None, profiler: Optional[BuildProfiler] = None,
+                 sitemap: Optional[SitemapWriter] = None, feeds: Optional[FeedWriter] = None,
+                 search: Optional[SearchIndexBuilder] = None, stable_pagination: bool = False,
+                 content: Optional[ContentIndex] = None, collect_glyphs: bool = False,
+                 preload_font: Optional[str] = None):
         self.output_dir = output_dir
         self.site_title = site_title
         self.base_url = base_url
         self.nav = nav
-        self.env = self._setup_jinja_environment()
-    
-    def _setup_jinja_environment(self) -> Environment:
-        """Set up Jinja2 environment with templates."""
-        return Environment(
-            loader=DictLoader({
-                'base.html': TEMPLATES['base.html'],
-                'page.html': TEMPLATES['page.html'],
-                'list.html': TEMPLATES['list.html'],
-            }),
-            autoescape=select_autoescape(['html', 'xml'])
+        self.manifest = manifest
+        self.jobs = jobs
+        self.graph = graph
+        self.asset_map = asset_map or {}
+        self.minify = minify
+        self.bytes_saved = 0
+        self.profiler = profiler
+        self.sitemap = sitemap
+        self.feeds = feeds
+        self.search = search
+        self.stable_pagination = stable_pagination
+        self.content = content or ContentIndex()
+        # Characters of every page written, to subset the custom fonts
+        self.glyphs: Optional[Set[str]] = set() if collect_glyphs else None
+        self.preload_font = preload_font
+        self.writer = OutputWriter(self.WRITER_THREADS)
+        self.search_index_url = f'{base_url}{SearchIndexBuilder.INDEX_DIR}/' if search is not None else None
+        self.converter = MarkdownConverter(**(markdown_config or {}), cache=cache)
+        # Options to rebuild an equivalent generator in worker processes
+        self._worker_options = {
+            'output_dir': output_dir,
+            'site_title': site_title,
+            'base_url': base_url,
+            'nav': nav,
+            'markdown_config': markdown_config,
+            'cache': cache,
+            'asset_map': asset_map,
+            'minify': minify,
+            'templates_dir': templates_dir,
+            'bytecode_cache_dir': bytecode_cache_dir,
+            'profiler': BuildProfiler() if profiler else None,
+            'search': search,
+            'collect_glyphs': collect_glyphs,
+            'preload_font': preload_font
+        }
+        self.env = self._setup_jinja_environment(templates_dir, bytecode_cache_dir)
+        # Compiled once; the environment doesn't check sources for changes
+        self.templates: Dict[str, Template] = {name: self.env.get_template(name) for name in self.PAGE_TEMPLATES}
+        # Hash of each template's source and of every template it extends or includes
+        self.template_hashes: Dict[str, str] = {name: self._template_hash(name) for name in self.PAGE_TEMPLATES}
+        self.nav_fragments = NavigationBuilder.render_fragments(nav, self.templates['nav.html'], base_url)
+        self._pool: Optional[ProcessPoolExecutor] = None
+    
+    def _setup_jinja_environment(self, templates_dir: Optional[str] = None,
+                                 bytecode_cache_dir: Optional[str] = None) -> Environment:
+        """
+        Set up Jinja2 environment with templates.
+        
+        Args:
+            templates_dir: Directory whose templates override the built-in ones
+            bytecode_cache_dir: Directory where compiled templates are persisted
+        """
+        loader = DictLoader({name: TEMPLATES[name] for name in self.PAGE_TEMPLATES})
+        if templates_dir and os.path.isdir(templates_dir):
+            loader = ChoiceLoader([FileSystemLoader(templates_dir), loader])
+        
+        bytecode_cache = None
+        if bytecode_cache_dir:
+            os.makedirs(bytecode_cache_dir, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(bytecode_cache_dir)
+        
+        env = Environment(
+            loader=loader,
+            autoescape=select_autoescape(['html', 'xml']),
+            bytecode_cache=bytecode_cache,
+            auto_reload=False
         )
+        env.globals['asset_url'] = self.asset_url
+        env.globals['search_index_url'] = self.search_index_url
+        env.globals['build_highlighting'] = self.converter.highlighter is not None
+        env.globals['preload_font'] = self.preload_font
+        return env
+    
+    def _template_hash(self, name: str) -> str:
+        """Hash the source of a template together with the templates it references."""
+        sources = {}
+        pending = [name]
+        while pending:
+            current = pending.pop()
+            if current in sources:
+                continue
+            source = self.env.loader.get_source(self.env, current)[0]
+            sources[current] = source
+            pending.extend(ref for ref in meta.find_referenced_templates(self.env.parse(source)) if ref)
+        return hash_inputs(sorted(sources.items()))
+    
+    def asset_url(self, name: str) -> str:
+        """Template helper: URL of an asset, using its fingerprinted name if there is one."""
+        return f'{self.base_url}assets/{self.asset_map.get(name, name)}'
+    
+    def _context_inputs(self, template_name: str) -> Tuple[Any, ...]:
+        """Inputs shared by every output rendered with a template."""
+        return (self.template_hashes[template_name], self.template_hashes['nav.html'],
+                self.site_title, self.base_url, self.nav, self.asset_map, self.minify, self.search_index_url,
+                self.converter.highlighter is not None, self.preload_font,
+                self.converter.images.cache_namespace if self.converter.images is not None else None,
+                METADATA_VERSION)
     
-    def _extract_page_metadata(self, md_content: str, fallback_title: str) -> Dict[str, str]:
-        """Extract metadata (title and description) from markdown content."""
-        title = extract_first_h1(md_content)
-        if not title:
-            title = fallback_title.replace('-', ' ').title()
+    def _is_up_to_date(self, rel_path: str, template_name: str, *inputs: Any) -> bool:
+        """Check the build manifest to see if an output can be skipped."""
+        if self.manifest is None:
+            return False
+        return self.manifest.is_up_to_date(rel_path, *self._context_inputs(template_name), *inputs)
+    
+    def _is_unchanged_source(self, rel_path: str, source_path: str, *inputs: Any) -> bool:
+        """Check the build manifest to see if an output can be skipped without reading its source."""
+        if self.manifest is None:
+            return False
+        stat = self.content.stat(source_path)
+        if stat is None:
+            return False
+        signature = hash_inputs(*self._context_inputs('page.html'), source_path,
+                                stat.st_size, stat.st_mtime_ns, *inputs)
+        return self.manifest.matches_signature(rel_path, signature)
+    
+    def _mark_changed(self, paths: List[str]) -> None:
+        """Report output files written with new content to the manifest."""
+        if self.manifest is not None:
+            for path in paths:
+                self.manifest.mark_changed(os.path.relpath(path, self.output_dir).replace(os.sep, '/'))
+    
+    def _add_to_sitemap(self, rel_url: str) -> None:
+        """Add a page to the sitemap, if one is being written."""
+        if self.sitemap is not None:
+            self.sitemap.add(rel_url)
+    
+    def _keeps_search_entry(self, url: str) -> bool:
+        """Check whether a skipped page keeps its search index entry (always true without search)."""
+        return self.search is None or self.search.keep_page(url)
+    
+    def _add_dependency(self, unit: str, output: str, *inputs: str) -> None:
+        """Register the inputs of an output in the dependency graph."""
+        if self.graph is not None:
+            self.graph.add(unit, output, inputs)
+    
+    def _timed(self, step: str, url: str):
+        """Time a page step if profiling, otherwise do nothing."""
+        return self.profiler.step(step, url) if self.profiler else nullcontext()
+    
+    def _phase(self, name: str):
+        """Time a build phase if profiling, otherwise do nothing."""
+        return self.profiler.phase(name) if self.profiler else nullcontext()
+    
+    def _read_source(self, path: str, url: str) -> str:
+        """Read the markdown source of a page."""
+        with self._timed('read', url):
+            with open(path, encoding='utf-8') as f:
+                return f.read()
+    
+    def _nav_html(self, current_url: str) -> str:
+        """Get the pre-rendered navigation menu for a page."""
+        return self.nav_fragments.get(current_url, self.nav_fragments[''])
+    
+    def _write_page(self, output_path: str, rendered: str) -> None:
+        """Queue a rendered page for writing, minifying it first if enabled."""
+        if self.minify:
+            minified = minify_html(rendered)
+            self.bytes_saved += len(rendered.encode('utf-8')) - len(minified.encode('utf-8'))
+            rendered = minified
+        if self.glyphs is not None:
+            self.glyphs.update(html.unescape(rendered))
+        self.writer.write(output_path, rendered)
+    
+    def _render_markdown_page(self, raw: str, fallback_title: str, current_url: str,
+                              source: Optional[str] = None) -> Tuple[Dict[str, Any], Optional[List[str]]]:
+        """
+        Convert markdown to HTML, render it with the page template and write it.
         
-        description = extract_first_h2(md_content)
-        if not description:
-            description = ""
+        Args:
+            raw: Markdown content, possibly with YAML front matter
+            fallback_title: Title used when the page has none
+            current_url: Output path of the page
+            source: Source file of a collection post, whose metadata also gets its sort order and date
         
-        return {
-            'title': title,
-            'description': description
+        Returns:
+            Page metadata (title and description from the front matter, or
+            from the first H1 and H2) and the page's search terms if indexing
+        """
+        with self._timed('convert', current_url):
+            front_matter, body = split_front_matter(raw)
+            result = self.converter.convert(body)
+        # Plain text, escaped by the templates
+        metadata = {
+            'title': front_matter.get('title') or result.title or fallback_title.replace('-', ' ').title(),
+            'description': front_matter.get('description') or result.description or ''
         }
+        if source is not None:
+            metadata['order'] = _post_order(front_matter.get('order'), source)
+            try:
+                metadata['date'] = parse_date(front_matter.get('date'))
+            except ValueError as e:
+                raise ValueError(f"Invalid front matter date in '{source}': {e}")
+        
+        with self._timed('render', current_url):
+            rendered = self.templates['page.html'].render(
+                site_title=self.site_title, 
+                page_title=metadata['title'], 
+                page_description=metadata['description'],
+                content=result.html,
+                nav=self.nav, 
+                nav_html=self._nav_html(current_url),
+                current_url=current_url, 
+                base_url=self.base_url
+            )
+        
+        output_path = os.path.join(self.output_dir, current_url)
+        with self._timed('write', current_url):
+            self._write_page(output_path, rendered)
+        
+        terms = extract_terms(result.html) if self.search is not None else None
+        return metadata, terms
+    
+    def _render_pages(self, tasks: List[Tuple[str, str, str, Optional[str]]]) -> List[Dict[str, Any]]:
+        """
+        Render markdown pages, in the worker pool when more than one job is configured.
+        
+        Args:
+            tasks: (markdown content, fallback title, output url, post source or None) of each page
+            
+        Returns:
+            Metadata of each page, in task order
+        """
+        if self.jobs <= 1 or len(tasks) <= 1:
+            results = [self._render_markdown_page(*task) for task in tasks]
+        else:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.jobs,
+                    initializer=_init_worker,
+                    initargs=(self._worker_options,)
+                )
+            
+            batch_size = max(1, len(tasks) // (self.jobs * self.BATCHES_PER_JOB))
+            batches = [tasks[start:start + batch_size] for start in range(0, len(tasks), batch_size)]
+            results = []
+            for batch_results, bytes_saved, events, changed, glyphs in self._pool.map(_render_page_batch, batches):
+                results.extend(batch_results)
+                if self.glyphs is not None:
+                    self.glyphs.update(glyphs)
+                self.bytes_saved += bytes_saved
+                self._mark_changed(changed)
+                if self.profiler:
+                    self.profiler.merge(events)
+        
+        for (_, _, current_url, _), (metadata, terms) in zip(tasks, results):
+            if self.manifest is not None:
+                self.manifest.set_metadata(current_url, metadata)
+            if self.search is not None:
+                self.search.add_page(current_url, metadata['title'], terms)
+        
+        return [metadata for metadata, _ in results]
+    
+    def close(self) -> None:
+        """Shut down the worker pool, if one was started, and finish writing pages."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        self.writer.close()
+        self._mark_changed(self.writer.take_changed())
     
     def generate_homepage(self, homepage_path: str) -> None:
         """Generate the homepage from markdown."""
-        with open(homepage_path, encoding='utf-8') as f:
-            raw = f.read()
-        
-        # Extract metadata
-        metadata = self._extract_page_metadata(raw, 'Home')
-        
-        html = markdown.markdown(raw, extensions=['fenced_code'])
-        rendered = self.env.get_template('page.html').render(
-            site_title=self.site_title, 
-            page_title=metadata['title'], 
-            page_description=metadata['description'],
-            content=html,
-            nav=self.nav, 
-            current_url='index.html', 
-            base_url=self.base_url
-        )
+        self._add_dependency(homepage_path, 'index.html', homepage_path)
+        self._add_to_sitemap('index.html')
+        
+        if self._is_unchanged_source('index.html', homepage_path) and self._keeps_search_entry('index.html'):
+            return
         
-        output_path = os.path.join(self.output_dir, 'index.html')
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(rendered)
+        raw = self._read_source(homepage_path, 'index.html')
+        
+        if self._is_up_to_date('index.html', 'page.html', raw) and self._keeps_search_entry('index.html'):
+            return
+        
+        self._render_pages([(raw, 'Home', 'index.html', None)])
     
     def generate_single_page(self, page_config: Dict[str, Any]) -> None:
         """Generate a single page from markdown."""
@@ -80,31 +383,24 @@ class PageGenerator:
         slug = slugify(clean_filename)
         
         path = page_config['path']
+        page_url = f'{slug}.html'
+        
+        self._add_dependency(path, page_url, path)
         
-        if not os.path.isfile(path):
+        if not self.content.is_file(path):
             print(f"Warning: File '{path}' not found.")
             return
         
-        with open(path, encoding='utf-8') as f:
-            raw = f.read()
-        
-        # Extract metadata
-        metadata = self._extract_page_metadata(raw, title)
-        
-        html = markdown.markdown(raw, extensions=['fenced_code'])
-        rendered = self.env.get_template('page.html').render(
-            site_title=self.site_title, 
-            page_title=metadata['title'],
-            page_description=metadata['description'],
-            content=html, 
-            nav=self.nav, 
-            current_url=f'{slug}.html', 
-            base_url=self.base_url
-        )
+        self._add_to_sitemap(page_url)
+        if self._is_unchanged_source(page_url, path, page_config) and self._keeps_search_entry(page_url):
+            return
+        
+        raw = self._read_source(path, page_url)
         
-        output_path = os.path.join(self.output_dir, f'{slug}.html')
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(rendered)
+        if self._is_up_to_date(page_url, 'page.html', raw, page_config) and self._keeps_search_entry(page_url):
+            return
+        
+        self._render_pages([(raw, title, page_url, None)])
     
     def generate_directory_pages(self, page_config: Dict[str, Any], paginate_by: int = 10) -> None:
         """Generate pages from a directory of markdown files with pagination."""
@@ -112,86 +408,149 @@ class PageGenerator:
         slug = slugify(title)
         path = page_config['path']
         
-        if not os.path.isdir(path):
+        if not self.content.is_dir(path):
             print(f"Warning: Directory '{path}' not found.")
             return
         
-        files = glob.glob(os.path.join(path, '*.md'))
-        files.sort(key=extract_order_number, reverse=True)
-        
-        items = []
+        # Only one compact record per post is kept for the list pages; posts are
+        # rendered in windows so at most RENDER_WINDOW sources are in memory
+        items: List[ListItem] = []
+        tasks = []
         
-        # Generate individual pages
-        for md_file in files:
+        # Collect list metadata from the manifest, or from the rendering of changed posts;
+        # posts in subdirectories belong to the collection too
+        for md_file in self.content.files(path, '.md'):
+            page_dir = self._collection_dir(slug, os.path.relpath(os.path.dirname(md_file), path))
             name = os.path.splitext(os.path.basename(md_file))[0]
             clean_name = remove_order_prefix(name)
             page_slug = slugify(clean_name)
+            page_url = f'{page_dir}/{page_slug}.html'
+            self._add_dependency(path, page_url, md_file)
             
-            with open(md_file, encoding='utf-8') as f:
-                raw = f.read()
+            if self._is_unchanged_source(page_url, md_file, page_config) and self._keeps_search_entry(page_url):
+                items.append(ListItem.from_metadata(page_url, self.manifest.get_metadata(page_url), md_file))
+                continue
             
-            # Extract metadata
-            metadata = self._extract_page_metadata(raw, clean_name)
+            raw = self._read_source(md_file, page_url)
             
-            content_html = markdown.markdown(raw, extensions=['fenced_code'])
-            rendered = self.env.get_template('page.html').render(
-                site_title=self.site_title, 
-                page_title=metadata['title'],
-                page_description=metadata['description'],
-                content=content_html, 
-                nav=self.nav,
-                current_url=f'{slug}/{page_slug}.html', 
-                base_url=self.base_url
-            )
-            
-            out_dir = os.path.join(self.output_dir, slug)
-            os.makedirs(out_dir, exist_ok=True)
+            if self._is_up_to_date(page_url, 'page.html', raw, page_config) and self._keeps_search_entry(page_url):
+                metadata = self.manifest.get_metadata(page_url)
+                if metadata is not None:
+                    items.append(ListItem.from_metadata(page_url, metadata, md_file))
+                    continue
             
-            output_path = os.path.join(out_dir, f'{page_slug}.html')
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(rendered)
-            
-            items.append({
-                'title': metadata['title'], 
-                'url': f'{slug}/{page_slug}.html',
-                'description': metadata['description']
-            })
+            tasks.append((raw, clean_name, page_url, md_file))
+            if len(tasks) == self.RENDER_WINDOW:
+                items += self._render_posts(tasks)
+                tasks = []
+        
+        # Generate the remaining individual pages
+        items += self._render_posts(tasks)
+        del tasks
+        
+        # Newest first by filename prefix, then by front matter order, which
+        # overrides the prefix; both sorts are stable
+        items.sort(key=lambda item: extract_order_number(item.source), reverse=True)
+        items.sort(key=lambda item: item.order, reverse=True)
+        for item in items:
+            self._add_to_sitemap(item.url)
         
         # Generate paginated list pages
-        self._generate_paginated_list(items, title, slug, paginate_by)
+        with self._phase(f'pagination: {slug}'):
+            list_urls = self._generate_paginated_list(items, len(items), title, slug, paginate_by)
+        for list_url in list_urls:
+            self._add_dependency(path, list_url, path)
+            self._add_to_sitemap(list_url)
+        
+        # Feed of the newest posts
+        if self.feeds is not None and items:
+            self._add_dependency(path, self.feeds.write_collection(slug, title, items), path)
+    
+    @staticmethod
+    def _collection_dir(slug: str, rel_dir: str) -> str:
+        """Get the output directory of the posts in a collection subdirectory."""
+        if rel_dir == os.curdir:
+            return slug
+        parts = [slugify(remove_order_prefix(part)) for part in rel_dir.split(os.sep)]
+        return '/'.join([slug] + parts)
     
-    def _generate_paginated_list(self, items: List[Dict[str, str]], title: str, slug: str, paginate_by: int) -> None:
-        """Generate paginated list pages for a collection."""
-        total = len(items)
-        pages_count = (total + paginate_by - 1) // paginate_by
+    def _render_posts(self, tasks: List[Tuple[str, str, str, Optional[str]]]) -> List[ListItem]:
+        """Render collection posts and get their list records from the rendered metadata."""
+        return [ListItem.from_metadata(page_url, metadata, source)
+                for (_, _, page_url, source), metadata in zip(tasks, self._render_pages(tasks))]
+    
+    def _generate_paginated_list(self, items: Iterable[ListItem], total: int, title: str, slug: str,
+                                 paginate_by: int) -> List[str]:
+        """
+        Generate paginated list pages for a collection.
+        
+        Each list page is rendered and written as soon as its items are
+        read, so rendered list pages don't accumulate. The records themselves
+        are not streamed: sorting by order needs the whole collection, so the
+        caller keeps one compact record per post in memory.
         
-        for i in range(1, pages_count + 1):
-            start = (i - 1) * paginate_by
-            end = start + paginate_by
-            page_items = items[start:end]
+        Args:
+            items: Records of the collection posts, newest first
+            total: Number of items
+            title: Collection title
+            slug: Collection slug
+            paginate_by: Number of items per list page
+        
+        Returns:
+            Output paths of the list pages
+        """
+        if not total:
+            return []
+        
+        # Page number (None for the index page) and number of items of each list page, newest first
+        if self.stable_pagination:
+            # Archive pages are numbered from the oldest posts, so they keep their
+            # items as posts are added; the index page holds the newest remainder
+            archive_count = (total - 1) // paginate_by
+            numbers = [None] + list(range(archive_count, 0, -1))
+            sizes = [total - archive_count * paginate_by] + [paginate_by] * archive_count
+        else:
+            pages_count = (total + paginate_by - 1) // paginate_by
+            numbers = [None] + list(range(2, pages_count + 1))
+            sizes = [paginate_by] * pages_count
+        
+        list_urls = [f'{slug}/index.html' if number is None else f'{slug}/page{number}.html' for number in numbers]
+        items = iter(items)
+        
+        for i, (number, size) in enumerate(zip(numbers, sizes)):
+            page_items = list(itertools.islice(items, size))
             
-            prev_url = f'{slug}/page{i-1}.html' if i > 2 else (f'{slug}/index.html' if i == 2 else None)
-            next_url = f'{slug}/page{i+1}.html' if i < pages_count else None
+            prev_url = list_urls[i - 1] if i > 0 else None
+            next_url = list_urls[i + 1] if i + 1 < len(list_urls) else None
             
             # Set page title and description for list pages
-            page_title = title if i == 1 else f'{title} - Page {i}'
-            page_description = f'{title} archive page' + (f' {i}' if i > 1 else '')
+            page_title = title if number is None else f'{title} - Page {number}'
+            page_description = f'{title} archive page' + (f' {number}' if number is not None else '')
             
-            rendered = self.env.get_template('list.html').render(
-                site_title=self.site_title, 
-                page_title=page_title,
-                page_description=page_description,
-                items=page_items, 
-                nav=self.nav,
-                current_url=f'{slug}/index.html',
-                prev_url=prev_url, 
-                next_url=next_url,
-                base_url=self.base_url
-            )
+            out_name = os.path.basename(list_urls[i])
+            if self._is_up_to_date(f'{slug}/{out_name}', 'list.html', page_title,
+                                   [item.key() for item in page_items], prev_url, next_url):
+                continue
             
-            out_file = os.path.join(self.output_dir, slug, 'index.html' if i == 1 else f'page{i}.html')
-            with open(out_file, 'w', encoding='utf-8') as f:
-                f.write(rendered)
+            with self._timed('render', f'{slug}/{out_name}'):
+                rendered = self.templates['list.html'].render(
+                    site_title=self.site_title, 
+                    page_title=page_title,
+                    page_description=page_description,
+                    items=page_items, 
+                    nav=self.nav,
+                    nav_html=self._nav_html(f'{slug}/index.html'),
+                    current_url=f'{slug}/index.html',
+                    prev_url=prev_url, 
+                    next_url=next_url,
+                    base_url=self.base_url
+                )
+            
+            out_file = os.path.join(self.output_dir, slug, out_name)
+            with self._timed('write', f'{slug}/{out_name}'):
+                self._write_page(out_file, rendered)
+        
+        return list_urls
     
     def _is_external_page(self, page_config: Dict[str, Any]) -> bool:
         """Check if a page is an external URL."""
@@ -206,9 +565,9 @@ class PageGenerator:
             
         path = page_config['path']
         
-        if os.path.isfile(path):
+        if self.content.is_file(path):
             self.generate_single_page(page_config)
-        elif os.path.isdir(path):
+        elif self.content.is_dir(path):
             self.generate_directory_pages(page_config, paginate_by)
         else:
             print(f"Warning: Path '{path}' not found.")
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+Static search index for client-side search.
+
+The index is an inverted index split into shards by term prefix, so the
+browser only downloads the shards the words of a query fall into:
+
+    search/meta.json          prefix length, shard names, document chunk size, stop words
+    search/terms/<prefix>.json  {term: [document id, ...]}
+    search/docs/<n>.json      [[title, url], ...] for a chunk of documents (null for unused ids)
+"""
+import os
+import re
+import json
+import html
+from typing import Any, Dict, List, Optional, Set
+
+from core.utils import write_if_changed, write_output
+from core.manifest import BuildManifest
+
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_TERM_RE = re.compile(r'\w+')
+
+STOP_WORDS = frozenset((
+    'a an and are as at be but by for from has have in is it its of on or that the this to was were will with'
+).split())
+
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 32
+
+
+def extract_terms(page_html: str) -> List[str]:
+    """
+    Get the distinct searchable terms of converted page HTML.
+
+    Args:
+        page_html: HTML produced by the markdown converter
+
+    Returns:
+        Lowercased terms, in order of first appearance
+    """
+    text = html.unescape(_TAG_RE.sub(' ', page_html)).lower()
+    # Deduplicate before filtering: pages repeat most of their words
+    return [term for term in dict.fromkeys(_TERM_RE.findall(text))
+            if MIN_TERM_LENGTH <= len(term) <= MAX_TERM_LENGTH and term not in STOP_WORDS]
+
+
+def shard_name(term: str, prefix_length: int) -> str:
+    """Get the shard a term belongs to; mirrored by the client script."""
+    return ''.join(c if 'a' <= c <= 'z' or '0' <= c <= '9' else f'_{ord(c):x}'
+                   for c in term[:prefix_length])
+
+
+class SearchIndexBuilder:
+    """Collects page terms during a build and writes the sharded index."""
+
+    # Kept in the build state dir with the manifest, out of the published site
+    STATE_FILE = 'search.json'
+    INDEX_DIR = 'search'
+    PREFIX_LENGTH = 2
+    DOC_CHUNK_SIZE = 500
+
+    def __init__(self, output_dir: str, state_dir: str, base_url: str, manifest: Optional[BuildManifest] = None,
+                 incremental: bool = False):
+        self.output_dir = output_dir
+        self.state_dir = state_dir
+        self.base_url = base_url
+        self.manifest = manifest
+        self.state_path = os.path.join(state_dir, self.STATE_FILE)
+        state = self._load()
+        # Url of each document id of the previous index (None for unused ids)
+        self._previous_ids: List[Optional[str]] = state.get('ids', [])
+        # Title and space-separated terms of every indexed page, by url
+        self._previous: Dict[str, List[str]] = state.get('pages', {}) if incremental else {}
+        self._pages: Dict[str, List[str]] = {}
+
+    def __getstate__(self):
+        # Worker processes only need to know that pages are indexed
+        state = self.__dict__.copy()
+        state.update(manifest=None, _previous_ids=[], _previous={}, _pages={})
+        return state
+
+    def _load(self) -> Dict[str, Any]:
+        """Load the document ids and page terms saved by the previous build, if any."""
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+        return state if isinstance(state.get('pages'), dict) else {}
+
+    def add_page(self, url: str, title: str, terms: List[str]) -> None:
+        """Index a rendered page."""
+        self._pages[url] = [title, ' '.join(terms)]
+
+    def keep_page(self, url: str) -> bool:
+        """
+        Keep the entry of an unchanged page from the previous build.
+
+        Returns:
+            False if the page wasn't indexed before and must be rendered
+        """
+        if url not in self._previous:
+            return False
+        self._pages[url] = self._previous[url]
+        return True
+
+    def retain_all(self, exclude: Set[str]) -> None:
+        """Keep the previous entries of every page except the excluded ones."""
+        for url, entry in self._previous.items():
+            if url not in exclude:
+                self._pages[url] = entry
+
+    def _write_if_changed(self, rel_path: str, content: str) -> None:
+        """Write an index file unless it already has this content."""
+        path = os.path.join(self.output_dir, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        changed = write_if_changed(path, content)
+        if self.manifest is not None:
+            if changed:
+                self.manifest.mark_changed(rel_path)
+            self.manifest.record(rel_path, content)
+
+    def write(self) -> int:
+        """
+        Write the index shards, document chunks and the state for the next build.
+
+        Returns:
+            Number of indexed pages
+        """
+        # Pages keep their document ids between builds and new pages take the ids of
+        # removed ones, so a change only rewrites the shards of the terms involved
+        ids = [url if url in self._pages else None for url in self._previous_ids]
+        placed = set(ids)
+        free = [doc_id for doc_id, url in enumerate(ids) if url is None]
+        free.reverse()
+        for url in self._pages:
+            if url in placed:
+                continue
+            if free:
+                ids[free.pop()] = url
+            else:
+                ids.append(url)
+        while ids and ids[-1] is None:
+            ids.pop()
+
+        postings: Dict[str, List[int]] = {}
+        docs: List[Optional[List[str]]] = []
+        for doc_id, url in enumerate(ids):
+            if url is None:
+                docs.append(None)
+                continue
+            title, terms = self._pages[url]
+            docs.append([title, url])
+            for term in terms.split():
+                doc_ids = postings.get(term)
+                if doc_ids is None:
+                    postings[term] = [doc_id]
+                else:
+                    doc_ids.append(doc_id)
+
+        shards: Dict[str, Dict[str, List[int]]] = {}
+        for term, doc_ids in postings.items():
+            shards.setdefault(shard_name(term, self.PREFIX_LENGTH), {})[term] = doc_ids
+
+        for name, shard in shards.items():
+            self._write_if_changed(f'{self.INDEX_DIR}/terms/{name}.json',
+                                   json.dumps(shard, sort_keys=True, separators=(',', ':'), ensure_ascii=False))
+        for start in range(0, len(docs), self.DOC_CHUNK_SIZE):
+            self._write_if_changed(f'{self.INDEX_DIR}/docs/{start // self.DOC_CHUNK_SIZE}.json',
+                                   json.dumps(docs[start:start + self.DOC_CHUNK_SIZE],
+                                              separators=(',', ':'), ensure_ascii=False))
+        self._write_if_changed(f'{self.INDEX_DIR}/meta.json', json.dumps({
+            'base_url': self.base_url,
+            'prefix_length': self.PREFIX_LENGTH,
+            'doc_chunk_size': self.DOC_CHUNK_SIZE,
+            'shards': sorted(shards),
+            'stop_words': sorted(STOP_WORDS)
+        }, separators=(',', ':'), ensure_ascii=False))
+
+        os.makedirs(self.state_dir, exist_ok=True)
+        write_output(self.state_path, json.dumps({'ids': ids, 'pages': self._pages},
+                                                 separators=(',', ':'), ensure_ascii=False))
+        return len(self._pages)
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming sitemap.xml writer for the static site generator.
+"""
+import os
+import filecmp
+from typing import List, Optional, TextIO
+from xml.sax.saxutils import escape
+
+from core.utils import open_output, write_if_changed
+from core.manifest import BuildManifest
+
+
+SITEMAP_NAMESPACE = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+class SitemapWriter:
+    """
+    Streams page URLs to sitemap.xml, splitting it behind a sitemap index when large.
+
+    The sitemaps protocol requires absolute URLs, so they are built from
+    the absolute URL of the site root (e.g. 'https://example.com/blog/').
+    """
+
+    FILENAME = 'sitemap.xml'
+    # Limit of URLs per sitemap file set by the sitemaps protocol
+    MAX_URLS = 50000
+
+    def __init__(self, output_dir: str, site_url: str, manifest: Optional[BuildManifest] = None):
+        self.output_dir = output_dir
+        self.site_url = site_url
+        self.manifest = manifest
+        self.count = 0
+        self._parts: List[str] = []
+        self._file: Optional[TextIO] = None
+        self._part_count = 0
+
+    def _start_part(self) -> None:
+        """Close the current sitemap file and start the next one."""
+        self._end_part()
+        name = f'sitemap-{len(self._parts) + 1}.xml'
+        self._parts.append(name)
+        # Streamed to a temporary file, published by close() only if it changed
+        self._file = open_output(os.path.join(self.output_dir, name + '.tmp'))
+        self._file.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{SITEMAP_NAMESPACE}">\n')
+        self._part_count = 0
+
+    def _end_part(self) -> None:
+        """Finish the current sitemap file, if any."""
+        if self._file is not None:
+            self._file.write('</urlset>\n')
+            self._file.close()
+            self._file = None
+
+    def add(self, rel_url: str) -> None:
+        """
+        Add a page to the sitemap.
+
+        Args:
+            rel_url: Output path of the page relative to the site root
+        """
+        if self._file is None or self._part_count == self.MAX_URLS:
+            self._start_part()
+        self._file.write(f'  <url><loc>{escape(self.site_url + rel_url)}</loc></url>\n')
+        self._part_count += 1
+        self.count += 1
+
+    def _publish(self, part: str, rel_path: str) -> None:
+        """Move a finished sitemap file in place, unless the existing file is identical."""
+        tmp_path = os.path.join(self.output_dir, part + '.tmp')
+        path = os.path.join(self.output_dir, rel_path)
+        if os.path.isfile(path) and filecmp.cmp(tmp_path, path, shallow=False):
+            os.remove(tmp_path)
+            return
+        os.replace(tmp_path, path)
+        if self.manifest is not None:
+            self.manifest.mark_changed(rel_path)
+
+    def close(self) -> List[str]:
+        """
+        Finish the sitemap.
+
+        A single file is published as sitemap.xml; several files are listed
+        in a sitemap index written as sitemap.xml.
+
+        Returns:
+            Output paths of the written sitemap files
+        """
+        if self._file is None and not self._parts:
+            self._start_part()
+        self._end_part()
+
+        if len(self._parts) == 1:
+            self._publish(self._parts[0], self.FILENAME)
+            written = [self.FILENAME]
+        else:
+            for name in self._parts:
+                self._publish(name, name)
+            lines = ['<?xml version="1.0" encoding="UTF-8"?>', f'<sitemapindex xmlns="{SITEMAP_NAMESPACE}">']
+            lines += [f'  <sitemap><loc>{escape(self.site_url + name)}</loc></sitemap>' for name in self._parts]
+            lines.append('</sitemapindex>')
+            if write_if_changed(os.path.join(self.output_dir, self.FILENAME), '\n'.join(lines) + '\n'):
+                if self.manifest is not None:
+                    self.manifest.mark_changed(self.FILENAME)
+            written = [self.FILENAME] + self._parts
+
+        if self.manifest is not None:
+            for rel_path in written:
+                self.manifest.record(rel_path, self.count)
+        self._parts = []
+        return written
@@ -1,67 +1,423 @@
 # -*- coding: utf-8 -*-
+import os
+import shutil
+from contextlib import nullcontext
+from typing import Any, Dict, Iterable, List, Optional
+
 from core.config import SiteConfig
+from core.manifest import BuildManifest
+from core.utils import hash_inputs
+from core.cache import ConversionCache
+from core.dependencies import DependencyGraph
+from core.staging import StagedOutput
+from core.profiler import BuildProfiler
+from core.content import ContentIndex
+from core.highlight import highlighting_available
+from core.fonts import FontSubsetter, subsetting_available
+from core.images import ImageProcessor, ResponsiveImages, images_available
+from core.compress import Precompressor, brotli_available
 from generators.asset_manager import AssetManager
 from generators.navigation import NavigationBuilder
 from generators.pages import PageGenerator
+from generators.sitemap import SitemapWriter
+from generators.feeds import FeedWriter
+from generators.search import SearchIndexBuilder
 
 
 class SiteGenerator:
     """Main site generator that orchestrates the build process."""
     
-    def __init__(self, config_path: str = 'config.yaml', output_dir: str = 'site'):
+    def __init__(self, config_path: str = 'config.yaml', output_dir: str = 'site', incremental: bool = False,
+                 jobs: int = 1, atomic: bool = False, minify: bool = False, profile: bool = False,
+                 precompress: bool = False, changes_file: Optional[str] = None):
         self.config = SiteConfig(config_path)
         self.output_dir = output_dir
-        self.asset_manager = AssetManager(output_dir, self.config.assets['source_dir'])
+        self.incremental = incremental
+        self.jobs = jobs
+        self.atomic = atomic
+        self.minify = minify
+        self.precompress = precompress
+        self.changes_file = changes_file
+        if precompress and not brotli_available():
+            print("Warning: .br sidecars need brotli (pip install brotli); writing .gz sidecars only")
+        self.profiler = BuildProfiler() if profile else None
+        self.cache = ConversionCache(self.config.cache['dir'], self.config.cache['max_size_mb'])
+        self.asset_manager = self._create_asset_manager(output_dir)
         self.nav_builder = NavigationBuilder(self.config.pages)
+        self.graph = DependencyGraph()
+        self.asset_map: Dict[str, str] = {}
+        self.content = ContentIndex()
+        self.highlight_style = self._highlight_style()
+        self.font_subsetter: Optional[FontSubsetter] = None
+        self.images: Optional[ResponsiveImages] = None
+    
+    def clear_cache(self) -> None:
+        """Remove the persistent build cache."""
+        self.cache.close()
+        if os.path.exists(self.cache.cache_dir):
+            shutil.rmtree(self.cache.cache_dir)
+        print(f"Cleared cache: {self.cache.cache_dir}")
+    
+    @property
+    def state_dir(self) -> str:
+        """Get the directory of the build state (manifest) of the output directory, inside the cache dir."""
+        return os.path.join(self.config.cache['dir'], 'builds', hash_inputs(os.path.abspath(self.output_dir))[:16])
     
-    def generate(self, paginate_by: int = 10) -> None:
+    def _phase(self, name: str):
+        """Time a build phase if profiling, otherwise do nothing."""
+        return self.profiler.phase(name) if self.profiler else nullcontext()
+    
+    def generate(self, paginate_by: int = 10) -> int:
         """
         Generate the complete static site.
         
         Args:
             paginate_by: Number of items per list page
+            
+        Returns:
+            Number of rendered pages
         """
         print(f"Generating website: {self.config.site_title}")
         print(f"Output directory: {self.output_dir}")
         
+        if not self.atomic:
+            return self._build(self.output_dir, paginate_by)
+        
+        # Build next to the live site and swap it in only once complete
+        staging = StagedOutput(self.output_dir)
+        with self._phase('staging'):
+            build_dir = staging.begin()
+        try:
+            return self._build(build_dir, paginate_by, staging)
+        except BaseException:
+            staging.abort()
+            raise
+    
+    def _build(self, build_dir: str, paginate_by: int, staging: Optional[StagedOutput] = None) -> int:
+        """Generate the site into a build directory, publishing it first if it's staged."""
+        manifest = BuildManifest(build_dir, self.state_dir, self.incremental, self.config.pages_hash)
+        self.graph.clear()
+        
         # Step 1: Generate assets
         print("Generating assets...")
-        self.asset_manager.generate_all_assets(self.config.theme)
+        self.font_subsetter = self._font_subsetter()
+        asset_manager = self._create_asset_manager(build_dir, manifest, self.font_subsetter)
+        with self._phase('assets'):
+            # Outputs are only rewritten when their content changes, so even full builds
+            # keep the previous output; files it no longer produces are swept at the end
+            synced = asset_manager.generate_all_assets(self.config.theme, clean=False,
+                                                       highlight_style=self.highlight_style,
+                                                       search=self.config.search)
+            for rel_path in synced:
+                self.graph.add('assets', rel_path, [self.config.assets['source_dir']])
+            self.asset_map = {}
+            if self.config.assets['fingerprint']:
+                self.asset_map = asset_manager.fingerprint_assets()
+                asset_manager.write_headers(self.asset_map, self.config.base_url)
+        
+        self.images = None
+        image_processor = self._image_processor()
+        if image_processor is not None:
+            with self._phase('images'):
+                images = asset_manager.write_image_variants(image_processor)
+                self.images = ResponsiveImages(images, self.config.images['sizes'], self.config.base_url)
         
         # Step 2: Build navigation
         print("Building navigation...")
-        nav = self.nav_builder.build_navigation()
+        with self._phase('navigation'):
+            self.content = self._scan_content()
+            nav = self.nav_builder.build_navigation(self.content)
+            
+            # Step 3: Initialize page generator (renders the navigation fragments)
+            sitemap = self._sitemap_writer(build_dir, manifest)
+            search = None
+            if self.config.search:
+                # Entries of pages skipped as unchanged come from the previous build
+                search = SearchIndexBuilder(build_dir, self.state_dir, self.config.base_url, manifest,
+                                            self.incremental)
+            page_generator = self._create_page_generator(nav, manifest, build_dir, sitemap, search)
+        
+        try:
+            # Step 4: Generate homepage
+            print("Generating homepage...")
+            with self._phase('homepage'):
+                page_generator.generate_homepage(self.config.homepage)
+            
+            # Step 5: Generate other pages
+            print("Generating pages...")
+            for page_config in self.config.pages:
+                page_title = page_config.get('title', 'Untitled')
+                path = page_config.get('path', '')
+                
+                # Check if it's an external URL
+                if path.lower().startswith(('http://', 'https://')):
+                    print(f"  - {page_title} (external link)")
+                else:
+                    print(f"  - {page_title}")
+                
+                with self._phase(f'page: {page_title}'):
+                    page_generator.generate_page(page_config, paginate_by)
+            if sitemap is not None:
+                sitemap.close()
+            if search is not None:
+                with self._phase('search index'):
+                    print(f"Indexed {search.write()} pages for search")
+        finally:
+            page_generator.close()
+            self.cache.prune()
         
-        # Step 3: Initialize page generator
-        page_generator = PageGenerator(
-            output_dir=self.output_dir,
+        if self.font_subsetter is not None:
+            # The subsets need the characters of every rendered page
+            with self._phase('fonts'):
+                self.font_subsetter.add_glyphs(page_generator.glyphs)
+                asset_manager.write_font_subsets()
+        
+        if self.precompress:
+            with self._phase('precompress'):
+                self._precompress(build_dir, manifest)
+
+        # Step 6: Drop outputs that are no longer produced
+        with self._phase('cleanup'):
+            # Staged builds start from a linked copy of the live site, so only sweep in place
+            removed = manifest.remove_stale_outputs(sweep=not (self.incremental or self.atomic))
+            changes = manifest.write_changes(self.config.base_url, removed, self.changes_file)
+        if staging is not None:
+            with self._phase('publish'):
+                staging.commit()
+        # Saved once the output is live, so the manifest always describes the published site
+        manifest.save()
+        
+        if self.minify:
+            print(f"Minification saved {asset_manager.bytes_saved + page_generator.bytes_saved} bytes")
+        
+        if self.incremental:
+            print(f"Rendered {manifest.rendered} pages, skipped {manifest.skipped} unchanged, "
+                  f"removed {len(removed)} stale")
+        print(f"Output changes: {len(changes['added'])} added, {len(changes['changed'])} changed, "
+              f"{len(changes['deleted'])} deleted (see {self.changes_file or manifest.changes_path})")
+        print("Generation complete!")
+        return manifest.rendered
+    
+    def _precompress(self, build_dir: str, manifest: BuildManifest) -> None:
+        """Write the compressed sidecars of the text outputs."""
+        written, reused = Precompressor(build_dir, manifest).compress()
+        print(f"Precompressed {written} files, reused {reused} unchanged")
+    
+    def _highlight_style(self) -> Optional[str]:
+        """Get the Pygments style of build-time highlighting, or None if it's disabled or unavailable."""
+        if not self.config.highlight['enabled']:
+            return None
+        if not highlighting_available():
+            print("Warning: build-time highlighting needs Pygments (pip install Pygments); "
+                  "using client-side highlighting")
+            return None
+        return self.config.highlight['style']
+    
+    def _font_subsetter(self) -> Optional[FontSubsetter]:
+        """Create the font subsetter of a build, or None if subsetting is disabled or unavailable."""
+        if not self.config.assets['subset_fonts']:
+            return None
+        if not subsetting_available():
+            print("Warning: font subsetting needs fontTools and brotli (pip install fonttools brotli); "
+                  "shipping the fonts as they are")
+            return None
+        # Skipped pages aren't scanned, so incremental builds extend the previous glyph set
+        return FontSubsetter(self.config.assets['source_dir'], self.config.cache['dir'], self.incremental)
+    
+    def _image_processor(self) -> Optional[ImageProcessor]:
+        """Create the image processor of a build, or None if responsive images are disabled or unavailable."""
+        if not self.config.images['enabled']:
+            return None
+        if not images_available():
+            print("Warning: responsive images need Pillow (pip install Pillow); linking the images as they are")
+            return None
+        return ImageProcessor(self.config.assets['source_dir'], self.config.cache['dir'],
+                              self.config.images['widths'], self.config.images['quality'])
+    
+    def _site_url(self, output: str) -> Optional[str]:
+        """Get the absolute URL of the site root for sitemap and feed links, or None (with a warning)."""
+        site_url = self.config.site_url
+        if site_url is None:
+            print(f"Warning: skipping {output}, sitemap and feed links must be absolute; set site_url "
+                  f"(e.g. \"https://example.com/blog/\") or use an absolute base_url")
+        return site_url
+    
+    def _sitemap_writer(self, build_dir: str, manifest: BuildManifest) -> Optional[SitemapWriter]:
+        """Create the sitemap writer of a build, or None if the sitemap is disabled or can't be written."""
+        if not self.config.sitemap:
+            return None
+        site_url = self._site_url('sitemap.xml')
+        return SitemapWriter(build_dir, site_url, manifest) if site_url is not None else None
+    
+    def _scan_content(self) -> ContentIndex:
+        """Walk the homepage and every local page path once, caching their stat results."""
+        content = ContentIndex()
+        content.scan([self.config.homepage] + [
+            page_config['path'] for page_config in self.config.pages
+            if not page_config.get('path', '').lower().startswith(('http://', 'https://'))
+        ])
+        return content
+    
+    def _create_asset_manager(self, output_dir: str, manifest: Optional[BuildManifest] = None,
+                              font_subsetter: Optional[FontSubsetter] = None) -> AssetManager:
+        """Create an asset manager for the current configuration."""
+        return AssetManager(
+            output_dir,
+            self.config.assets['source_dir'],
+            hardlink=self.config.assets['hardlink'],
+            manifest=manifest,
+            minify=self.minify,
+            font_subsetter=font_subsetter
+        )
+    
+    def _create_page_generator(self, nav: List[Dict[str, Any]], manifest: BuildManifest, output_dir: str,
+                               sitemap: Optional[SitemapWriter] = None,
+                               search: Optional[SearchIndexBuilder] = None) -> PageGenerator:
+        """Create a page generator for the current configuration."""
+        feeds = None
+        site_url = self._site_url('collection feeds') if self.config.feeds['enabled'] else None
+        if site_url is not None:
+            feeds = FeedWriter(output_dir, site_url, self.config.site_title,
+                               self.config.feeds['format'], self.config.feeds['limit'], manifest)
+        return PageGenerator(
+            output_dir=output_dir,
             site_title=self.config.site_title,
             base_url=self.config.base_url,
-            nav=nav
+            nav=nav,
+            manifest=manifest,
+            jobs=self.jobs,
+            markdown_config={**self.config.markdown, 'highlight_style': self.highlight_style,
+                             'images': self.images},
+            cache=self.cache,
+            graph=self.graph,
+            asset_map=self.asset_map,
+            minify=self.minify,
+            templates_dir=self.config.templates_dir,
+            bytecode_cache_dir=os.path.join(self.config.cache['dir'], 'templates'),
+            profiler=self.profiler,
+            sitemap=sitemap,
+            feeds=feeds,
+            search=search,
+            stable_pagination=self.config.stable_pagination,
+            content=self.content,
+            collect_glyphs=self.font_subsetter is not None,
+            preload_font=self.font_subsetter.primary_font if self.font_subsetter is not None else None
         )
+    
+    def _adds_or_removes_page(self, path: str) -> bool:
+        """Check whether a changed source path is a page that was added or removed since the last build."""
+        if not path.endswith('.md'):
+            return False
+        return not os.path.isfile(path) or not self.graph.has_input(path)
+    
+    def rebuild(self, changed_paths: Iterable[str], paginate_by: int = 10) -> int:
+        """
+        Rebuild only the outputs affected by changed source paths.
         
-        # Step 4: Generate homepage
-        print("Generating homepage...")
-        page_generator.generate_homepage(self.config.homepage)
+        Relies on the dependency graph recorded by a previous generate() call.
         
-        # Step 5: Generate other pages
-        print("Generating pages...")
-        for page_config in self.config.pages:
-            page_title = page_config.get('title', 'Untitled')
-            path = page_config.get('path', '')
-            
-            # Check if it's an external URL
-            if path.lower().startswith(('http://', 'https://')):
-                print(f"  - {page_title} (external link)")
-            else:
-                print(f"  - {page_title}")
+        Args:
+            changed_paths: Added, modified or removed source paths
+            paginate_by: Number of items per list page
             
-            page_generator.generate_page(page_config, paginate_by)
-
-        print("Generation complete!")
+        Returns:
+            Number of rendered pages
+        """
+        changed = {os.path.normpath(path) for path in changed_paths}
+        
+        if os.path.normpath(self.config.config_path) in changed:
+            previous = self.config
+            self.config = SiteConfig(previous.config_path)
+            self.highlight_style = self._highlight_style()
+            # A theme change rewrites style.css (and its fingerprinted name, referenced from every page);
+            # the incremental build records it in the manifest and refreshes its sidecars
+            theme_changed = self.config.theme != previous.theme
+            subsetting_changed = self.config.assets['subset_fonts'] != previous.assets['subset_fonts']
+            images_changed = self.config.images != previous.images
+            if (self.config.pages_hash != previous.pages_hash or theme_changed or subsetting_changed
+                    or images_changed):
+                self.asset_manager = self._create_asset_manager(self.output_dir)
+                self.nav_builder = NavigationBuilder(self.config.pages)
+                self.incremental = True
+                return self.generate(paginate_by)
+        
+        templates_dir = os.path.normpath(self.config.templates_dir)
+        if any(path.startswith(templates_dir + os.sep) for path in changed):
+            # Template hashes in the manifest select the pages using the changed template
+            self.incremental = True
+            return self.generate(paginate_by)
+        
+        units = self.graph.affected_units(changed)
+        # Collections and asset dirs that produced no output yet aren't in the graph
+        roots = {page_config['path']: page_config['path'] for page_config in self.config.pages}
+        roots[self.config.assets['source_dir']] = 'assets'
+        for root, unit in roots.items():
+            root = os.path.normpath(root)
+            if any(path == root or path.startswith(root + os.sep) for path in changed):
+                units.add(unit)
+        
+        if not units:
+            return 0
+        
+        if self.config.sitemap and any(self._adds_or_removes_page(path) for path in changed):
+            # sitemap.xml lists every page; the incremental build rewrites it and skips unchanged pages
+            self.incremental = True
+            return self.generate(paginate_by)
+        
+        manifest = BuildManifest(self.output_dir, self.state_dir, True, self.config.pages_hash)
+        rebuilt_outputs = set()
+        for unit in units:
+            rebuilt_outputs |= self.graph.clear_unit(unit)
+        manifest.retain_all(exclude=rebuilt_outputs)
+        
+        if 'assets' in units and (self.config.assets['fingerprint'] or self.images is not None):
+            # A changed custom-font.css gets a new fingerprinted name referenced by every page,
+            # and pages link the variants and dimensions of the images
+            return self.generate(paginate_by)
+        
+        if 'assets' in units:
+            print("  - assets")
+            asset_manager = self._create_asset_manager(self.output_dir, manifest, self.font_subsetter)
+            for rel_path in asset_manager.copy_custom_assets():
+                self.graph.add('assets', rel_path, [self.config.assets['source_dir']])
+        
+        search = None
+        if self.config.search:
+            search = SearchIndexBuilder(self.output_dir, self.state_dir, self.config.base_url, manifest,
+                                        incremental=True)
+            search.retain_all(exclude={url for url in rebuilt_outputs if url.endswith('.html')})
+        # Sources are stat'ed lazily, so only the affected paths are read
+        self.content = ContentIndex()
+        page_generator = self._create_page_generator(self.nav_builder.build_navigation(self.content), manifest,
+                                                     self.output_dir, search=search)
+        try:
+            if self.config.homepage in units:
+                print("  - Home")
+                page_generator.generate_homepage(self.config.homepage)
+            for page_config in self.config.pages:
+                if page_config['path'] in units:
+                    print(f"  - {page_config.get('title', 'Untitled')}")
+                    page_generator.generate_page(page_config, paginate_by)
+            if search is not None:
+                search.write()
+        finally:
+            page_generator.close()
+        
+        if self.font_subsetter is not None:
+            self.font_subsetter.add_glyphs(page_generator.glyphs)
+            self._create_asset_manager(self.output_dir, manifest, self.font_subsetter).write_font_subsets()
+        if self.precompress:
+            self._precompress(self.output_dir, manifest)
+        
+        manifest.write_changes(self.config.base_url, manifest.remove_stale_outputs(), self.changes_file)
+        manifest.save()
+        return manifest.rendered
 
 
-def generate_site(config_path: str = 'config.yaml', output_dir: str = 'site', paginate_by: int = 10) -> None:
+def generate_site(config_path: str = 'config.yaml', output_dir: str = 'site', paginate_by: int = 10,
+                  incremental: bool = False, jobs: int = 1, clear_cache: bool = False,
+                  atomic: bool = False, minify: bool = False, profile: Optional[str] = None,
+                  profile_top: int = 10, precompress: bool = False, changes_file: Optional[str] = None) -> int:
     """
     Convenience function to generate a site.
     
@@ -69,6 +425,26 @@ def generate_site(config_path: str = 'config.yaml', output_dir: str = 'site', pa
         config_path: Path to the configuration file
         output_dir: Output directory for the generated site
         paginate_by: Number of items per list page
+        incremental: Only re-render outputs whose inputs changed since the last build
+        jobs: Number of worker processes used to render pages
+        clear_cache: Remove the persistent build cache before generating
+        atomic: Build into a staging directory and swap it in when complete
+        minify: Minify generated CSS, JavaScript and HTML
+        profile: Path of a Chrome trace file to write build timings to
+        profile_top: Number of slowest pages listed in the profile summary
+        precompress: Write .gz and .br sidecars of the text outputs
+        changes_file: Where to write the URLs the build changed (defaults to the build state dir)
+        
+    Returns:
+        Number of rendered pages
     """
-    generator = SiteGenerator(config_path, output_dir)
-    generator.generate(paginate_by)
+    generator = SiteGenerator(config_path, output_dir, incremental, jobs, atomic, minify, profile=bool(profile),
+                              precompress=precompress, changes_file=changes_file)
+    if clear_cache:
+        generator.clear_cache()
+    rendered = generator.generate(paginate_by)
+    if profile:
+        generator.profiler.write_trace(profile)
+        generator.profiler.print_summary(profile_top)
+        print(f"Profile trace written to {profile}")
+    return rendered
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Watch mode: rebuild the outputs affected by each source change.
+"""
+import os
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from site_generator import SiteGenerator
+
+
+class SiteWatcher:
+    """Polls the site sources and triggers targeted rebuilds."""
+
+    def __init__(self, generator: SiteGenerator, paginate_by: int = 10, interval: float = 0.5):
+        self.generator = generator
+        self.paginate_by = paginate_by
+        self.interval = interval
+
+    def _watched_paths(self) -> List[str]:
+        """Get the config file, assets dir, user templates dir and content paths to watch."""
+        config = self.generator.config
+        paths = [config.config_path, config.assets['source_dir'], config.templates_dir, config.homepage]
+        for page_config in config.pages:
+            path = page_config.get('path', '')
+            if not path.lower().startswith(('http://', 'https://')):
+                paths.append(path)
+        return paths
+
+    def snapshot(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Stat every watched file.
+
+        Returns:
+            Mapping of file path to (mtime in ns, size)
+        """
+        state = {}
+        for root in self._watched_paths():
+            if os.path.isfile(root):
+                st = os.stat(root)
+                state[os.path.normpath(root)] = (st.st_mtime_ns, st.st_size)
+                continue
+            for dirpath, _, filenames in os.walk(root):
+                for filename in filenames:
+                    path = os.path.normpath(os.path.join(dirpath, filename))
+                    try:
+                        st = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    state[path] = (st.st_mtime_ns, st.st_size)
+        return state
+
+    @staticmethod
+    def diff(before: Dict[str, Tuple[int, int]], after: Dict[str, Tuple[int, int]]) -> Set[str]:
+        """Get the paths added, removed or modified between two snapshots."""
+        return {path for path in before.keys() | after.keys() if before.get(path) != after.get(path)}
+
+    def run(self) -> None:
+        """Build the site, then rebuild on every change until interrupted."""
+        self.generator.generate(self.paginate_by)
+        self.generator.incremental = True
+        state = self.snapshot()
+        print(f"Watching for changes (every {self.interval}s), press Ctrl+C to stop...")
+
+        try:
+            while True:
+                time.sleep(self.interval)
+                current = self.snapshot()
+                changed = self.diff(state, current)
+                state = current
+                if not changed:
+                    continue
+
+                print(f"Changed: {', '.join(sorted(changed))}")
+                start = time.perf_counter()
+                try:
+                    rendered = self.generator.rebuild(changed, self.paginate_by)
+                except Exception as e:
+                    print(f"Rebuild failed: {e}")
+                    continue
+                elapsed = (time.perf_counter() - start) * 1000
+                print(f"Rebuilt {rendered} pages in {elapsed:.0f} ms")
+        except KeyboardInterrupt:
+            print("Stopped watching.")
+
+
+def watch_site(config_path: str = 'config.yaml', output_dir: str = 'site', paginate_by: int = 10,
+               jobs: int = 1, interval: float = 0.5, clear_cache: bool = False, minify: bool = False,
+               precompress: bool = False, changes_file: Optional[str] = None) -> None:
+    """
+    Convenience function to build a site and keep it up to date.
+
+    Args:
+        config_path: Path to the configuration file
+        output_dir: Output directory for the generated site
+        paginate_by: Number of items per list page
+        jobs: Number of worker processes used to render pages
+        interval: Seconds between polls of the sources
+        clear_cache: Remove the persistent build cache before the first build
+        minify: Minify generated CSS, JavaScript and HTML
+        precompress: Write .gz and .br sidecars of the text outputs
+        changes_file: Where to write the URLs each build changed (defaults to the build state dir)
+    """
+    generator = SiteGenerator(config_path, output_dir, incremental=True, jobs=jobs, minify=minify,
+                              precompress=precompress, changes_file=changes_file)
+    if clear_cache:
+        generator.clear_cache()
+    SiteWatcher(generator, paginate_by, interval).run()
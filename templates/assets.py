@@ -288,7 +288,41 @@ main {
     box-shadow: 0 3px 10px color-mix(in srgb, var(--primary-color) 30%, transparent);
 }
 
-/* Mobile Styles */
+{% if search %}/* Search */
+.search {
+    position: relative;
+}
+
+.search input {
+    font-family: inherit;
+    font-size: 0.9rem;
+    padding: 0.5rem 1rem;
+    border: 1px solid var(--border-color);
+    border-radius: 20px;
+    background: var(--bg-color);
+}
+
+.search ul {
+    position: absolute;
+    right: 0;
+    top: 100%;
+    width: 320px;
+    max-height: 60vh;
+    overflow-y: auto;
+    list-style: none;
+    margin: 0.5rem 0 0;
+    padding: 0.5rem;
+    background: var(--bg-color);
+    border-radius: 10px;
+    box-shadow: 0 5px 20px rgba(0, 0, 0, 0.1);
+}
+
+.search li a {
+    display: block;
+    padding: 0.5rem;
+}
+
+{% endif %}/* Mobile Styles */
 @media (max-width: 768px) {
     .container {
         padding: 0.5rem;
@@ -478,7 +512,74 @@ JS_TEMPLATE = '''document.addEventListener('DOMContentLoaded', () => {
         });
     });
     
-    // Add scroll effect to header
+{% if search %}    // Client-side search: only the index shards of the query terms are fetched
+    const searchInput = document.getElementById('search-input');
+    const searchResults = document.getElementById('search-results');
+    
+    if (searchInput && searchResults) {
+        const indexUrl = searchInput.dataset.index;
+        const cache = {};
+        const fetchJson = (path) => {
+            if (!cache[path]) {
+                cache[path] = fetch(indexUrl + path).then(r => r.ok ? r.json() : null).catch(() => null);
+            }
+            return cache[path];
+        };
+        // Mirrors shard_name() in generators/search.py
+        const shardName = (term, length) => Array.from(term).slice(0, length)
+            .map(c => /[a-z0-9]/.test(c) ? c : '_' + c.codePointAt(0).toString(16)).join('');
+        
+        const findDocs = async (term, meta) => {
+            const name = shardName(term, meta.prefix_length);
+            if (!meta.shards.includes(name)) return new Set();
+            const shard = await fetchJson('terms/' + name + '.json') || {};
+            // Prefix match, so results show up while typing
+            const ids = new Set();
+            Object.keys(shard).forEach(key => {
+                if (key.startsWith(term)) shard[key].forEach(id => ids.add(id));
+            });
+            return ids;
+        };
+        
+        const search = async (query) => {
+            const meta = await fetchJson('meta.json');
+            // Stop words aren't indexed, so they would match nothing but longer words
+            const terms = (query.toLowerCase().match(/[\\p{L}\\p{N}_]+/gu) || [])
+                .filter(term => Array.from(term).length >= meta.prefix_length && !meta.stop_words.includes(term));
+            if (!terms.length) return [];
+            
+            let matches = null;
+            for (const docs of await Promise.all(terms.map(term => findDocs(term, meta)))) {
+                matches = matches ? new Set([...matches].filter(id => docs.has(id))) : docs;
+            }
+            const ids = [...matches].sort((a, b) => a - b).slice(0, 10);
+            return Promise.all(ids.map(async id => {
+                const chunk = await fetchJson('docs/' + Math.floor(id / meta.doc_chunk_size) + '.json');
+                return chunk[id % meta.doc_chunk_size];
+            }));
+        };
+        
+        let timer = null;
+        searchInput.addEventListener('input', () => {
+            clearTimeout(timer);
+            timer = setTimeout(async () => {
+                const query = searchInput.value;
+                const results = await search(query);
+                if (query !== searchInput.value) return;
+                searchResults.replaceChildren(...results.map(([title, url]) => {
+                    const item = document.createElement('li');
+                    const link = document.createElement('a');
+                    link.href = indexUrl.slice(0, -'search/'.length) + url;
+                    link.textContent = title;
+                    item.appendChild(link);
+                    return item;
+                }));
+                searchResults.hidden = results.length === 0;
+            }, 150);
+        });
+    }
+    
+{% endif %}    // Add scroll effect to header
     let lastScroll = 0;
     const header = document.querySelector('header');
     
@@ -26,10 +26,12 @@ BASE_TEMPLATE = '''<!DOCTYPE html>
     <meta name="twitter:description" content="{{ page_description or 'Static site generated with AutoSite' }}">
     <meta name="twitter:card" content="summary_large_image">
     
-    <link rel="stylesheet" href="{{ base_url }}assets/custom-font.css">
-    <link rel="stylesheet" href="{{ base_url }}assets/style.css">
+    {% if preload_font %}<link rel="preload" href="{{ asset_url(preload_font) }}" as="font" type="font/woff2" crossorigin>
+    {% endif %}<link rel="stylesheet" href="{{ asset_url('custom-font.css') }}">
+    <link rel="stylesheet" href="{{ asset_url('style.css') }}">{% if build_highlighting %}
+    <link rel="stylesheet" href="{{ asset_url('highlight.css') }}">{% else %}
     <script src="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.7.0/highlight.min.js"></script>
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.7.0/styles/github.min.css">
+    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.7.0/styles/github.min.css">{% endif %}
 </head>
 <body>
     <header>
@@ -37,24 +39,18 @@ BASE_TEMPLATE = '''<!DOCTYPE html>
             <h1 class="logo"><a href="{{ base_url }}index.html">{{ site_title }}</a></h1>
             <button class="menu-toggle">☰</button>
             <nav>
-                <ul>
-                    {% for p in nav %}
-                    <li{% if p.url == current_url %} class="active"{% endif %}>
-                        {% if p.external %}
-                        <a href="{{ p.url }}" target="_blank" rel="noopener noreferrer">{{ p.title }}</a>
-                        {% else %}
-                        <a href="{{ base_url }}{{ p.url }}">{{ p.title }}</a>
-                        {% endif %}
-                    </li>
-                    {% endfor %}
-                </ul>
-            </nav>
+                {{ nav_html }}
+            </nav>{% if search_index_url %}
+            <div class="search">
+                <input type="search" id="search-input" placeholder="Search..." aria-label="Search" autocomplete="off" data-index="{{ search_index_url }}">
+                <ul id="search-results" hidden></ul>
+            </div>{% endif %}
         </div>
     </header>
     <main>
         {% block content %}{% endblock %}
     </main>
-    <script src="{{ base_url }}assets/script.js"></script>
-    <script>hljs.highlightAll();</script>
+    <script src="{{ asset_url('script.js') }}"></script>{% if not build_highlighting %}
+    <script>hljs.highlightAll();</script>{% endif %}
 </body>
 </html>'''
@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+"""
+Navigation menu template, pre-rendered once per active entry.
+"""
+
+NAV_TEMPLATE = '''<ul>
+                    {% for p in nav %}
+                    <li{% if p.url == current_url %} class="active"{% endif %}>
+                        {% if p.external %}
+                        <a href="{{ p.url }}" target="_blank" rel="noopener noreferrer">{{ p.title }}</a>
+                        {% else %}
+                        <a href="{{ base_url }}{{ p.url }}">{{ p.title }}</a>
+                        {% endif %}
+                    </li>
+                    {% endfor %}
+                </ul>'''